@@ -1,7 +1,18 @@
-import pandas as pd
-import random
-from app.utils.constants import SKIP_ASSIGNMENT_ROLES
+import datetime
+from functools import lru_cache
+import numpy as np
+from app.utils.constants import SKIP_ASSIGNMENT_ROLES, RECENT_ROLES_PER_MEMBER
 
+# Cost weights for the role x member matrix (lower cost = better fit)
+REPEAT_PENALTY = 10.0  # member held this role recently; outweighs every other term
+RECENCY_WEIGHT = 3.0  # member had any role recently
+RECENCY_HORIZON_DAYS = 42  # after this long without a role, the recency cost is zero
+FAIRNESS_WEIGHT = 0.5  # per recent role held, spreads roles across the club
+TIE_BREAK_NOISE = 0.25  # random jitter so equally good members rotate
+EMPTY_SLOT_COST = 1000.0  # leaving a slot unfilled when there are too few members
+
+
+@lru_cache(maxsize=1024)
 def canonicalize_role(role):
     role = str(role).strip().lower()
     if role.startswith("speaker"):
@@ -16,81 +27,299 @@ def canonicalize_role(role):
         return "Table Topics"
     return role.title()
 
-def get_suggested_assignments(agenda_data, past_data, members):
-    # ✅ Step 1: Prepare Agenda DataFrame
-    agenda_df = pd.DataFrame(agenda_data)
-    agenda_df = agenda_df[~agenda_df["Role"].isin(SKIP_ASSIGNMENT_ROLES) & ~agenda_df["Role"].str.startswith("Theme for the meeting")]
-    agenda_df = agenda_df.reset_index(drop=True)
 
-    if agenda_df.empty:
-        raise Exception("No valid agenda found for this date")
+def linear_sum_assignment(cost):
+    # Hungarian algorithm (shortest augmenting path, O(n^2 m)) with the inner
+    # column scan vectorised; returns (rows, cols) like scipy's function of the same name
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j]: 1-based row matched to column j, 0 if free
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            reduced = np.empty(m + 1)
+            reduced[0] = np.inf
+            reduced[1:] = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv)
+            minv[better] = reduced[better]
+            way[better] = j0
+            candidates = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _clean_name(value):
+    if value is None or value != value:  # None or NaN
+        return ""
+    name = str(value).strip()
+    return "" if name == "nan" else name
+
+
+def build_role_history(past_data, depth=RECENT_ROLES_PER_MEMBER):
+    # Member -> [(meeting date, canonical role), ...], most recent first, `depth` deep
+    history = {}
+    for item in past_data:
+        name = _clean_name(item.get("Name"))
+        if name:
+            history.setdefault(name, []).append((_to_date(item["MeetingDate"]), canonicalize_role(item["Role"])))
+    for name, roles in history.items():
+        roles.sort(key=lambda entry: entry[0], reverse=True)
+        del roles[depth:]
+    return history
+
 
-    # ✅ Step 2: Build Past Roles Dictionary
-    past_df = pd.DataFrame(past_data)
-    if not past_df.empty:
-        past_df['MeetingDate'] = pd.to_datetime(past_df['MeetingDate'])
-        past_roles = (
-            past_df.sort_values('MeetingDate', ascending=False)
-            .groupby('Name')['Role']
-            .apply(lambda x: list(x)[:3])
-            .to_dict()
-        )
-    else:
-        past_roles = {}
-
-    # ✅ Step 3: Detect Pre-assigned Members (Used Members)
-    raw_names = agenda_df["Name"]
-    used_members = set(str(n).strip() for n in raw_names if pd.notna(n) and str(n).strip() != "")
-
-    available_members = [m for m in members if m not in used_members]
-    random.shuffle(available_members)
-
-    assignments = []
-
-    # ✅ Step 4: Assign Primary Roles
-    for _, row in agenda_df.iterrows():
-        role = row["Role"]
-        raw_name = row.get("Name")
-        name = "" if pd.isna(raw_name) else str(raw_name).strip()
-        canon_role = canonicalize_role(role)
-
-        if role in SKIP_ASSIGNMENT_ROLES:
-            primary = ""
-        elif name:  # If already assigned in the agenda
-            primary = name
-        else:
-            eligible = [
-                m for m in available_members
-                if canon_role not in [canonicalize_role(r) for r in past_roles.get(m, [])]
-            ]
-            if not eligible:
-                eligible = available_members.copy()
-
-            primary = eligible.pop() if eligible else ""
-
-            if primary:
-                used_members.add(primary)
-                if primary in available_members:
-                    available_members.remove(primary)
-
-        assignments.append({
-            "Role": role,
-            "Original": name,
-            "Primary": primary,
-            "Backup": ""
-        })
-
-    # ✅ Step 5: Assign Backups
+def record_roles(history, meeting_date, assignments, depth=RECENT_ROLES_PER_MEMBER):
+    # Add a planned meeting's primaries to the history, as if it had already happened
+    meeting_date = _to_date(meeting_date)
     for assignment in assignments:
-        if available_members:
-            backup = available_members.pop()
-            assignment["Backup"] = backup
-        else:
-            assignment["Backup"] = ""
-
-    # ✅ Step 6: Clean Up
-    df = pd.DataFrame(assignments)
-    for col in ["Original", "Primary", "Backup"]:
-        df[col] = df[col].replace("nan", "").fillna("")
-
-    return df.to_dict(orient="records")
+        name = assignment.get("Primary")
+        if name:
+            roles = history.setdefault(name, [])
+            roles.insert(0, (meeting_date, canonicalize_role(assignment["Role"])))
+            del roles[depth:]
+    return history
+
+
+def prepare_agenda(agenda_data):
+    # Assignable rows of an agenda as (role, name already on the agenda)
+    slots = []
+    for item in agenda_data:
+        role = item.get("Role")
+        if not role or role in SKIP_ASSIGNMENT_ROLES or role.startswith("Theme for the meeting"):
+            continue
+        slots.append((role, _clean_name(item.get("Name"))))
+    return slots
+
+
+def member_costs(history, members, meeting_date):
+    # Per-member recency and fairness costs, independent of the role being filled
+    recency = np.zeros(len(members))
+    fairness = np.zeros(len(members))
+    for col, member in enumerate(members):
+        roles = history.get(member)
+        if roles:
+            days_since = (meeting_date - roles[0][0]).days
+            recency[col] = RECENCY_WEIGHT * max(0.0, 1 - days_since / RECENCY_HORIZON_DAYS)
+            fairness[col] = FAIRNESS_WEIGHT * len(roles)
+    return recency + fairness
+
+
+def build_cost_matrix(roles, members, history, meeting_date, rng):
+    # Rows are roles, columns members; cost = repetition + recency + fairness + jitter
+    canon_roles = [canonicalize_role(role) for role in roles]
+    role_index = {role: row for row, role in enumerate(dict.fromkeys(canon_roles))}
+
+    repeats = np.zeros((len(role_index), len(members)))
+    for col, member in enumerate(members):
+        for position, (_, canon_role) in enumerate(history.get(member, [])):
+            row = role_index.get(canon_role)
+            if row is not None:
+                # The more recently the role was held, the larger the penalty
+                repeats[row, col] = max(repeats[row, col], REPEAT_PENALTY * (RECENT_ROLES_PER_MEMBER - position))
+
+    rows = np.array([role_index[role] for role in canon_roles], dtype=int)
+    cost = repeats[rows] + member_costs(history, members, meeting_date)[None, :]
+    return cost + rng.uniform(0, TIE_BREAK_NOISE, size=cost.shape)
+
+
+def solve_cost(cost, members):
+    # Min-cost assignment on a roles x `members` cost matrix; unfillable roles get ""
+    n_roles = cost.shape[0]
+    if not n_roles:
+        return []
+    if not members:
+        return [""] * n_roles
+
+    if len(members) < n_roles:
+        # Dummy "nobody" columns; later agenda slots are left empty first
+        dummy = EMPTY_SLOT_COST + np.arange(n_roles, 0, -1, dtype=float)
+        cost = np.hstack([cost, np.repeat(dummy[:, None], n_roles - len(members), axis=1)])
+
+    chosen = [""] * n_roles
+    for row, col in zip(*linear_sum_assignment(cost)):
+        if col < len(members):
+            chosen[row] = members[col]
+    return chosen
+
+
+def fill_rows(cost, members, rows, exclude):
+    # Best members outside `exclude` for the slots at `rows` of a slots x `members` cost matrix
+    cols = [col for col, member in enumerate(members) if member not in exclude]
+    return solve_cost(cost[np.ix_(rows, cols)], [members[col] for col in cols])
+
+
+def assign_from_cost(slots, cost, members):
+    # Fill open slots with primaries, then give every slot a backup from who is left
+    used_members = set(name for _, name in slots if name)
+    open_rows = [row for row, (_, name) in enumerate(slots) if not name]
+    primaries = fill_rows(cost, members, open_rows, used_members)
+
+    assignments = [{"Role": role, "Original": name, "Primary": name, "Backup": ""} for role, name in slots]
+    for row, primary in zip(open_rows, primaries):
+        assignments[row]["Primary"] = primary
+
+    taken = used_members | set(primaries)
+    backups = fill_rows(cost, members, list(range(len(slots))), taken)
+    for assignment, backup in zip(assignments, backups):
+        assignment["Backup"] = backup
+    return assignments
+
+
+def assign_roles(slots, members, history, meeting_date, rng):
+    # Primaries and backups from one cost matrix over every slot and member
+    cost = build_cost_matrix([role for role, _ in slots], members, history, meeting_date, rng)
+    return assign_from_cost(slots, cost, members)
+
+
+def get_suggested_assignments(agenda_data, history, members, seed=None, meeting_date=None):
+    # `history` maps each member to their recent canonical roles (RoleHistory.role_history())
+    # ✅ Step 1: Assignable agenda rows
+    slots = prepare_agenda(agenda_data)
+    if not slots:
+        raise Exception("No valid agenda found for this date")
+
+    # ✅ Step 2: Meeting date the recency costs are measured from
+    meeting_date = _to_date(meeting_date) if meeting_date else datetime.date.today()
+
+    # ✅ Step 3: Min-cost primaries and backups (seeded for reproducible suggestions)
+    rng = np.random.default_rng(seed)
+    return assign_roles(slots, list(members), history, meeting_date, rng)
+
+
+class MeetingState:
+    # One meeting's assignable slots and full role x member cost matrix, kept between
+    # requests so an edited role is re-suggested without reloading or rescoring history
+    def __init__(self, agenda_data, history, members, meeting_date=None, seed=None):
+        self.slots = prepare_agenda(agenda_data)
+        if not self.slots:
+            raise Exception("No valid agenda found for this date")
+        self.history = history
+        self.meeting_date = _to_date(meeting_date) if meeting_date else datetime.date.today()
+        self.members = list(members)
+        rng = np.random.default_rng(seed)
+        self.cost = build_cost_matrix([role for role, _ in self.slots], self.members, self.history, self.meeting_date, rng)
+        self.rows = {}
+        for row, (role, _) in enumerate(self.slots):
+            self.rows.setdefault(role, row)
+
+    def suggest(self):
+        # The suggested roster, solved on the cached costs that later edits re-use
+        return assign_from_cost(self.slots, self.cost, self.members)
+
+    def fill(self, rows, exclude):
+        # Best members outside `exclude` for the slots at `rows`, on the cached costs
+        return fill_rows(self.cost, self.members, rows, exclude)
+
+
+def resuggest_roles(state, roster, role, primary=None):
+    # Apply one edit to a suggested roster and re-fill only what it affects: the edited slot
+    # if its primary was cleared, a slot whose primary the edit took, and backups that now
+    # clash with a primary. Every other slot keeps its primary and backup.
+    roster = [dict(item) for item in roster]
+    index = {}
+    for position, item in enumerate(roster):
+        index.setdefault(item["Role"], position)
+    if role not in index:
+        raise ValueError(f"Role not in roster: {role}")
+    unknown = [item["Role"] for item in roster if item["Role"] not in state.rows]
+    if unknown:
+        raise ValueError(f"Roles not on the stored agenda: {', '.join(unknown)}")
+    rows = [state.rows[item["Role"]] for item in roster]
+
+    edited = index[role]
+    primary = (primary or "").strip()
+    roster[edited]["Primary"] = primary
+    open_primaries = [] if primary else [edited]
+    for position, item in enumerate(roster):
+        if primary and position != edited and item["Primary"] == primary:
+            item["Primary"] = ""  # one member, one role
+            open_primaries.append(position)
+
+    if open_primaries:
+        taken = {item["Primary"] for item in roster if item["Primary"]}
+        backups = {item["Backup"] for item in roster if item["Backup"]}
+        open_rows = [rows[position] for position in open_primaries]
+        # Prefer members who aren't anyone's backup, so the other backups stay put
+        chosen = state.fill(open_rows, taken | backups)
+        if not all(chosen):
+            chosen = state.fill(open_rows, taken)
+        for position, name in zip(open_primaries, chosen):
+            roster[position]["Primary"] = name
+
+    taken = {item["Primary"] for item in roster if item["Primary"]}
+    open_backups = [
+        position for position, item in enumerate(roster)
+        if not item["Backup"] or item["Backup"] in taken
+    ]
+    kept = {item["Backup"] for position, item in enumerate(roster) if item["Backup"] and position not in open_backups}
+    chosen = state.fill([rows[position] for position in open_backups], taken | kept)
+    for position, name in zip(open_backups, chosen):
+        roster[position]["Backup"] = name
+    return roster
+
+
+def apply_saved_assignments(assignments, saved_assignments):
+    # Saved choices override the suggested primary for their role
+    for item in assignments:
+        if item["Role"] in saved_assignments:
+            item["Primary"] = saved_assignments[item["Role"]]
+    return assignments
+
+
+def plan_meetings(meetings, history, members, seed=None):
+    # Plan consecutive meetings in date order from one history, feeding each planned
+    # meeting back into it so the same member isn't proposed for a role week after week.
+    # `meetings` is a list of (meeting_date, agenda_data, saved_assignments); `history` is
+    # updated in place.
+    rng = np.random.default_rng(seed)
+    members = list(members)
+
+    plan = []
+    for meeting_date, agenda_data, saved_assignments in sorted(meetings, key=lambda m: str(m[0])):
+        slots = prepare_agenda(agenda_data)
+        assignments = assign_roles(slots, members, history, _to_date(meeting_date), rng) if slots else []
+        apply_saved_assignments(assignments, saved_assignments)
+        record_roles(history, meeting_date, assignments)
+        plan.append({"meeting_date": str(meeting_date), "agenda": assignments})
+    return plan
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Response
+from app.responses import dumps, choose_encoding, compress
+from app.utils.config import RESPONSE_CACHE_SIZE, COMPRESS_MIN_SIZE
+
+
+class CacheEntry:
+    def __init__(self, body, tags, last_modified, state=None):
+        self.body = body
+        self.state = state  # what the body was built from, for follow-up requests on it
+        self.tags = frozenset(tags)
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.last_modified = last_modified
+        self.compressible = len(body) >= COMPRESS_MIN_SIZE
+        self._encoded = {}  # content-coding -> compressed body, built on first request for it
+
+    def variant_etag(self, encoding):
+        # Each content-coding is a different representation, so it gets its own validator
+        return self.etag[:-1] + "-" + encoding + '"' if encoding else self.etag
+
+    def encoded(self, encoding):
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+    def headers(self, encoding=None):
+        headers = {
+            "ETag": self.variant_etag(encoding),
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": "no-cache",  # always revalidate, usually answered with 304
+        }
+        if encoding:
+            # GZipMiddleware adds Vary itself to large bodies it passes through uncompressed
+            headers["Vary"] = "Accept-Encoding"
+            headers["Content-Encoding"] = encoding
+        return headers
+
+    def not_modified(self, request):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            # A validator of any encoding matches: they all come from the same body
+            return "*" in tags or any(tag == self.etag or tag.startswith(self.etag[:-1] + "-") for tag in tags)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.last_modified) <= since
+        return False
+
+
+class ResponseCache:
+    # Bounded LRU of serialized JSON responses; entries are dropped by tag when data changes
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._modified = {}  # tag -> time of its last invalidation
+        self._invalidated_at = {}  # tag -> generation of its last invalidation
+        self.generation = 0
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, tags, body, generation=None, state=None):
+        with self._lock:
+            last_modified = max([self._modified.get(tag, self._started) for tag in tags] or [self._started])
+            entry = CacheEntry(body, tags, last_modified, state)
+            # Don't store a response built from data invalidated while it was being built
+            if generation is not None and self.changed_since(tags, generation):
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def changed_since(self, tags, generation):
+        return any(self._invalidated_at.get(tag, 0) > generation for tag in tags)
+
+    def invalidate(self, *tags):
+        now = time.time()
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                self._modified[tag] = now
+                self._invalidated_at[tag] = self.generation
+            return self._drop(tags)
+
+    def discard(self, *tags):
+        # Drop entries by tag without marking the tags changed: builds running now are still cached
+        with self._lock:
+            return self._drop(tags)
+
+    def _drop(self, tags):
+        stale = [key for key, entry in self._entries.items() if entry.tags.intersection(tags)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class WithState:
+    # A build result whose `state` is kept on the cache entry next to the serialized payload,
+    # so it lives and is evicted exactly as long as the response built from it
+    def __init__(self, payload, state):
+        self.payload = payload
+        self.state = state
+
+
+class SingleFlight:
+    # Concurrent cache misses for the same key await one build instead of each running it.
+    # A build whose tags were invalidated after it started is not joined by later requests.
+    def __init__(self, cache):
+        self.cache = cache
+        self._flights = {}  # key -> (cache generation when the build started, task)
+
+    async def run(self, key, tags, build):
+        loop = asyncio.get_running_loop()
+        flight = self._flights.get(key)
+        if flight is None or flight[1].get_loop() is not loop or self.cache.changed_since(tags, flight[0]):
+            generation = self.cache.generation
+            task = loop.create_task(self._build(key, tags, build, generation))
+            flight = self._flights[key] = (generation, task)
+            task.add_done_callback(lambda _: self._finish(key, flight))
+        # One client disconnecting must not cancel the build the others are waiting on
+        return await asyncio.shield(flight[1])
+
+    async def _build(self, key, tags, build, generation):
+        result = await build()
+        if isinstance(result, WithState):
+            return self.cache.put(key, tags, dumps(result.payload), generation, result.state)
+        return self.cache.put(key, tags, dumps(result), generation)
+
+    def _finish(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        task = flight[1]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+in_flight = SingleFlight(response_cache)
+
+
+def club_tags(club_id, *tags):
+    # Cache tags are per club, so one club's writes don't evict another club's responses
+    return tuple(f"{club_id}:{tag}" for tag in tags)
+
+
+def _entry_response(request, entry):
+    # Large bodies go out brotli/gzip compressed; the compressed bytes are kept on the entry
+    encoding = choose_encoding(request.headers.get("accept-encoding", "")) if entry.compressible else None
+    headers = entry.headers(encoding)
+    if entry.not_modified(request):
+        return Response(status_code=304, headers=headers)
+    body = entry.encoded(encoding) if encoding else entry.body
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _check_agendas(tags):
+    # Agendas written by another process don't invalidate this one's cache; the role history
+    # check (every HISTORY_TTL seconds) compares them with storage and drops stale responses
+    from app.history import get_history_async
+    for tag in tags:
+        club_id, _, name = tag.rpartition(":")
+        if name == "agendas":
+            await get_history_async(club_id)
+
+
+async def cached_entry(key, tags, build=None):
+    # The cache entry for `key`, built by `await build()` when missing (None without a build).
+    # Identical requests arriving while it runs share its result.
+    entry = response_cache.get(key)
+    if entry is not None:
+        await _check_agendas(tags)
+        entry = response_cache.get(key)
+    if entry is None and build is not None:
+        entry = await in_flight.run(key, tags, build)
+    return entry
+
+
+async def cached_json_async(request, key, tags, build):
+    # Serve `await build()` through the response cache, answering conditional requests with 304
+    return _entry_response(request, await cached_entry(key, tags, build))
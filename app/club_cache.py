@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+
+class ClubCache:
+    # One in-process value per club (member directory, role history, ...). `load(club_id,
+    # previous)` builds a club's value; it is reused while `is_fresh(value, club_id)` holds.
+    # Concurrent callers after expiry wait for a single reload of their club.
+    def __init__(self, load, is_fresh):
+        self.load = load
+        self.is_fresh = is_fresh
+        self._values = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _club_lock(self, club_id):
+        with self._lock:
+            return self._locks.setdefault(club_id, threading.Lock())
+
+    def get(self, club_id):
+        value = self._values.get(club_id)
+        if self.is_fresh(value, club_id):
+            return value
+        with self._club_lock(club_id):
+            value = self._values.get(club_id)
+            if self.is_fresh(value, club_id):
+                return value
+            value = self._values[club_id] = self.load(club_id, value)
+            return value
+
+    async def get_async(self, club_id):
+        # Fresh value straight from memory; a reload runs on a worker thread
+        value = self._values.get(club_id)
+        if self.is_fresh(value, club_id):
+            return value
+        return await asyncio.to_thread(self.get, club_id)
+
+    def reload(self, club_id, load=None):
+        # Rebuild now, fresh or not; `load` overrides the usual loader for this call
+        with self._club_lock(club_id):
+            value = self._values[club_id] = (load or self.load)(club_id, self._values.get(club_id))
+            return value
+
+    def pop(self, club_id):
+        self._values.pop(club_id, None)
+
+    def clear(self):
+        self._values.clear()
@@ -0,0 +1,75 @@
+import json
+import threading
+import time
+from app.utils.config import (
+    CLUBS, CLUBS_FILE, DEFAULT_CLUB_ID, CLUB_NUMBER, PASSWORD, CLUB_URL, LOGIN_URL, AGENDA_URL,
+    AGENDA_PAGE_URL, TARGET_DATE, SCRAPER_RATE_LIMIT,
+)
+
+
+class RateLimiter:
+    # Spaces out requests to one club's site, across all threads fetching for it
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second and per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class Club:
+    def __init__(self, id, number, password, url, login_url=None, agenda_url=None,
+                 agenda_page_url=None, target_date=None, rate_limit=None):
+        self.id = id
+        self.number = number
+        self.password = password
+        self.url = url.rstrip("/")
+        self.agenda_url = agenda_url or f"{self.url}/agenda.html"
+        self.login_url = login_url or f"{self.url}/login.html"
+        # Agenda page for a GotoAgenda option value that is not itself a URL
+        self.agenda_page_url = agenda_page_url or self.agenda_url + "?t={value}"
+        self.target_date = target_date
+        self.rate_limiter = RateLimiter(SCRAPER_RATE_LIMIT if rate_limit is None else rate_limit)
+
+    def to_dict(self):
+        return {"id": self.id, "url": self.url}
+
+
+def load_clubs():
+    if CLUBS_FILE:
+        with open(CLUBS_FILE, encoding="utf-8") as f:
+            entries = json.load(f)
+    elif CLUBS:
+        entries = json.loads(CLUBS)
+    else:
+        return {DEFAULT_CLUB_ID: Club(
+            DEFAULT_CLUB_ID, CLUB_NUMBER, PASSWORD, CLUB_URL,
+            login_url=LOGIN_URL, agenda_url=AGENDA_URL, agenda_page_url=AGENDA_PAGE_URL,
+            target_date=TARGET_DATE,
+        )}
+
+    clubs = {}
+    for entry in entries:
+        club = Club(**entry)
+        if club.id in clubs:
+            raise ValueError(f"Duplicate club id: {club.id}")
+        clubs[club.id] = club
+    if DEFAULT_CLUB_ID not in clubs:
+        raise ValueError(f"DEFAULT_CLUB_ID {DEFAULT_CLUB_ID!r} is not one of the configured clubs")
+    return clubs
+
+
+clubs = load_clubs()
+
+
+def get_club(club_id=None):
+    # None for an unknown id
+    return clubs.get(club_id or DEFAULT_CLUB_ID)
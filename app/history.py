@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from app.assignment import canonicalize_role
+from app.storage import get_store
+from app.cache import response_cache, club_tags
+from app.club_cache import ClubCache
+from app.utils.config import HISTORY_TTL, HISTORY_DIR, DEFAULT_CLUB_ID
+from app.utils.constants import SKIP_ASSIGNMENT_ROLES, RECENT_ROLES_PER_MEMBER
+
+COLUMNS = ("member", "role", "day")
+WINDOWS = {"month": "datetime64[M]", "quarter": "datetime64[M]", "year": "datetime64[Y]"}
+
+
+def is_counted(role):
+    # Roles that count towards progress and analytics (the same ones suggestions fill)
+    return role not in SKIP_ASSIGNMENT_ROLES and not role.startswith("Theme for the meeting")
+
+
+def _ranks(groups):
+    # Position of each row among the rows of its group, in row order
+    order = np.argsort(groups, kind="stable")
+    starts = np.flatnonzero(np.r_[True, groups[order][1:] != groups[order][:-1]]) if len(groups) else order
+    sizes = np.diff(np.r_[starts, len(groups)])
+    ranks = np.empty(len(groups), dtype=np.int64)
+    ranks[order] = np.arange(len(groups)) - np.repeat(starts, sizes)
+    return ranks
+
+
+def _period_label(period, window):
+    if window == "quarter":
+        year, month = str(period)[:7].split("-")
+        return f"{year}-Q{(int(month) - 1) // 3 + 1}"
+    return str(period)
+
+
+def agenda_fingerprint(content_hashes):
+    # Identifies the stored agendas: latest meeting date plus a digest of every content hash
+    digest = hashlib.sha256()
+    for meeting_date in sorted(content_hashes):
+        digest.update(f"{meeting_date}={content_hashes[meeting_date]}\n".encode("utf-8"))
+    return f"{max(content_hashes, default='')}:{digest.hexdigest()}"
+
+
+class RoleHistory:
+    # Every named role a club's members held, as columns: member and role codes into
+    # `names` / `roles`, and the meeting day. Rows run from the latest meeting back, in
+    # agenda order within a meeting. Columns may be memory-mapped from a saved snapshot.
+    def __init__(self, member, role, day, names, roles, fingerprint=None, built_at=None, generation=0):
+        self.member = member
+        self.role = role
+        self.day = day
+        self.names = list(names)
+        self.roles = list(roles)
+        self.fingerprint = fingerprint  # agenda_fingerprint() of the agendas it was built from
+        self.built_at = built_at or time.time()
+        self.generation = generation  # response cache generation when the agendas were read
+        self.checked_at = time.time()  # last time the fingerprint matched storage
+        canonical = [canonicalize_role(role) for role in self.roles]
+        self.canonical_roles = sorted(set(canonical))
+        positions = {role: index for index, role in enumerate(self.canonical_roles)}
+        self.canonical = np.array([positions[role] for role in canonical], dtype=np.int32)
+        self.counted = np.array([is_counted(role) for role in self.roles], dtype=bool)
+
+    @classmethod
+    def from_agendas(cls, records, fingerprint=None, generation=0):
+        rows = []
+        for record in records:
+            items = [item for item in record['agenda_json'] if item.get('Name') and str(item['Name']).strip()]
+            order = sorted(range(len(items)), key=lambda i: (items[i].get('SortOrder') is None, items[i].get('SortOrder') or 0, i))
+            rows += [(str(record['meeting_date'])[:10], position, items[i]) for position, i in enumerate(order)]
+        rows.sort(key=lambda row: (row[0], -row[1]), reverse=True)
+
+        names, roles = {}, {}
+        member = np.fromiter((names.setdefault(str(item['Name']).strip(), len(names)) for _, _, item in rows), np.int32, len(rows))
+        role = np.fromiter((roles.setdefault(item['Role'], len(roles)) for _, _, item in rows), np.int32, len(rows))
+        day = np.array([meeting_date for meeting_date, _, _ in rows], dtype="datetime64[D]")
+        return cls(member, role, day, names, roles, fingerprint, generation=generation)
+
+    def __len__(self):
+        return len(self.member)
+
+    def _before(self, before):
+        # Rows before a date are a suffix of the columns (days run backwards)
+        if before is None:
+            return 0
+        return len(self.day) - int(np.searchsorted(self.day[::-1], np.datetime64(str(before)[:10], "D")))
+
+    def role_history(self, before=None, depth=RECENT_ROLES_PER_MEMBER):
+        # Member -> [(meeting date, canonical role), ...] before a date, most recent first:
+        # the same shape as assignment.build_role_history
+        start = self._before(before)
+        member = self.member[start:]
+        keep = np.flatnonzero(_ranks(member) < depth) + start
+        history = {}
+        for code, day, canonical in zip(self.member[keep].tolist(), self.day[keep].astype(object), self.canonical[self.role[keep]].tolist()):
+            history.setdefault(self.names[code], []).append((day, self.canonical_roles[canonical]))
+        return history
+
+    def summary(self, depth=RECENT_ROLES_PER_MEMBER):
+        # Member -> (roles held, last meeting date, most recent roles) over the counted roles
+        rows = np.flatnonzero(self.counted[self.role])
+        member = self.member[rows]
+        totals = np.bincount(member, minlength=len(self.names))
+        codes, first = np.unique(member, return_index=True)
+        last_dates = dict(zip(codes.tolist(), self.day[rows[first]].astype(object)))
+        recent = {}
+        keep = rows[_ranks(member) < depth]
+        for code, role in zip(self.member[keep].tolist(), self.role[keep].tolist()):
+            recent.setdefault(code, []).append(self.roles[role])
+        return {self.names[code]: (int(totals[code]), last_dates[code], recent[code]) for code in codes.tolist()}
+
+    def role_frequencies(self, window="month", start=None, end=None):
+        # Counted roles held per member, canonical role and period, as
+        # (period labels, {member: {role: [count per period]}}); only non-zero series are listed
+        day = self.day
+        mask = self.counted[self.role]
+        if start is not None:
+            mask &= day >= np.datetime64(str(start)[:10], "D")
+        if end is not None:
+            mask &= day <= np.datetime64(str(end)[:10], "D")
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return [], {}
+
+        periods = day[rows].astype(WINDOWS[window]).astype(np.int64)
+        if window == "quarter":
+            periods //= 3
+        first = int(periods.min())
+        periods -= first
+        count = int(periods.max()) + 1
+        roles = len(self.canonical_roles)
+
+        keys = (self.member[rows].astype(np.int64) * roles + self.canonical[self.role[rows]]) * count + periods
+        keys, counts = np.unique(keys, return_counts=True)
+        series, periods = np.divmod(keys, count)
+        frequencies = {}
+        for code, period, counted in zip(series.tolist(), periods.tolist(), counts.tolist()):
+            member, canonical = divmod(code, roles)
+            by_role = frequencies.setdefault(self.names[member], {})
+            by_role.setdefault(self.canonical_roles[canonical], [0] * count)[period] = counted
+
+        unit = "M" if window == "quarter" else WINDOWS[window][-2]
+        step = 3 if window == "quarter" else 1
+        labels = [
+            _period_label(np.datetime64((first + index) * step, unit), window)
+            for index in range(count)
+        ]
+        return labels, frequencies
+
+    def save(self, directory, source):
+        # One .npy file per column, then meta.json naming them: readers never see a partial
+        # snapshot. `source` names the store and club the agendas came from.
+        os.makedirs(directory, exist_ok=True)
+        stamp = f"{int(self.built_at * 1000)}-{os.getpid()}"
+        for column in COLUMNS:
+            path = os.path.join(directory, f"{stamp}.{column}.npy")
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, column)))
+            os.replace(path + ".tmp", path)
+        meta = {
+            "stamp": stamp, "source": source, "fingerprint": self.fingerprint, "built_at": self.built_at,
+            "names": self.names, "roles": self.roles,
+        }
+        with open(os.path.join(directory, "meta.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(directory, "meta.json.tmp"), os.path.join(directory, "meta.json"))
+
+        for filename in os.listdir(directory):
+            if filename.endswith(".npy") and not filename.startswith(stamp + "."):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, directory, source, fingerprint, generation=0):
+        # Memory-maps the columns of the last saved snapshot. None when there is none, or when it
+        # was built from another store or club, or from agendas that have changed since.
+        try:
+            with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("source") != source or meta.get("fingerprint") != fingerprint:
+                return None
+            columns = [
+                np.load(os.path.join(directory, f"{meta['stamp']}.{column}.npy"), mmap_mode="r")
+                for column in COLUMNS
+            ]
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(*columns, meta["names"], meta["roles"], fingerprint, meta["built_at"], generation)
+
+
+def snapshot_source(store, club_id):
+    # Backend, database and club a snapshot belongs to; None when the database is in memory
+    location = getattr(store, "location", None)
+    return f"{store.backend}:{location}#{club_id}" if location else None
+
+
+def snapshot_directory(source):
+    if not HISTORY_DIR or not source:
+        return None
+    return os.path.join(HISTORY_DIR, hashlib.sha256(source.encode("utf-8")).hexdigest()[:16])
+
+
+def _is_fresh(history, club_id):
+    return (
+        history is not None
+        and time.time() - history.checked_at <= HISTORY_TTL
+        and not response_cache.changed_since(club_tags(club_id, "agendas"), history.generation)
+    )
+
+
+def build_history(club_id, previous=None):
+    # Rebuild from the stored agendas and save the snapshot for the next process start.
+    # Hashes are read first: a write in between leaves an older fingerprint, never a newer one.
+    generation = response_cache.generation
+    store = get_store(club_id)
+    fingerprint = agenda_fingerprint(store.agendas.content_hashes())
+    history = RoleHistory.from_agendas(store.agendas.all(), fingerprint, generation)
+
+    source = snapshot_source(store, club_id)
+    directory = snapshot_directory(source)
+    if directory:
+        try:
+            history.save(directory, source)
+        except OSError as e:
+            print(f"⚠️ Could not save role history snapshot of {club_id}: {e}")
+    print(f"📚 Built role history of {club_id}: {len(history)} roles, {len(history.names)} members.")
+    return history
+
+
+def _load_history(club_id, previous):
+    # Reuse the current or saved snapshot while the stored agendas match its fingerprint
+    generation = response_cache.generation
+    store = get_store(club_id)
+    fingerprint = agenda_fingerprint(store.agendas.content_hashes())
+    if previous is not None and previous.fingerprint == fingerprint:
+        previous.generation = generation
+        previous.checked_at = time.time()
+        return previous
+
+    # The agendas were written by another process (python -m app.reparse, another worker):
+    # drop the responses built from them. Before the first load there is nothing to compare
+    # with, so responses cached until now are dropped, but requests already running may
+    # still cache theirs (they read the agendas this history is loaded from).
+    if previous is None:
+        response_cache.discard(*club_tags(club_id, "agendas"))
+    else:
+        response_cache.invalidate(*club_tags(club_id, "agendas"))
+    generation = response_cache.generation
+    if previous is None:
+        source = snapshot_source(store, club_id)
+        directory = snapshot_directory(source)
+        history = RoleHistory.load(directory, source, fingerprint, generation) if directory else None
+        if history is not None:
+            return history
+    return build_history(club_id)
+
+
+_histories = ClubCache(_load_history, _is_fresh)
+
+
+def refresh_history(club_id=None):
+    return _histories.reload(club_id or DEFAULT_CLUB_ID, build_history)
+
+
+def get_history(club_id=None):
+    return _histories.get(club_id or DEFAULT_CLUB_ID)
+
+
+async def get_history_async(club_id=None):
+    return await _histories.get_async(club_id or DEFAULT_CLUB_ID)
+
+
+def invalidate_history(club_id=None):
+    _histories.pop(club_id or DEFAULT_CLUB_ID)
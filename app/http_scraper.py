@@ -0,0 +1,91 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urljoin
+import httpx
+from bs4 import BeautifulSoup
+from app.metrics import time_phase
+from app.utils.config import SCRAPER_CONCURRENCY, SCRAPER_HTTP_TIMEOUT
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) tm-api agenda sync"
+
+
+def create_session():
+    # One pooled client shared by every request of a sync run
+    limits = httpx.Limits(
+        max_connections=SCRAPER_CONCURRENCY,
+        max_keepalive_connections=SCRAPER_CONCURRENCY,
+    )
+    return httpx.Client(
+        limits=limits,
+        timeout=SCRAPER_HTTP_TIMEOUT,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def login(session, logs, club):
+    logs.append("🔐 Logging in (HTTP)...")
+    with time_phase("login"):
+        club.rate_limiter.wait()
+        response = session.post(club.login_url, data={"clubnumber": club.number, "password": club.password})
+        response.raise_for_status()
+    # A rejected login still answers 2xx: it shows the form again and starts no session
+    if not session.cookies:
+        raise ValueError("Login failed: no session cookie was set")
+    if BeautifulSoup(response.text, "html.parser").find("input", attrs={"type": "password"}) is not None:
+        raise ValueError("Login failed: the login form was returned again")
+    logs.append("✅ Login successful.")
+
+
+def list_agenda_options(session, club):
+    club.rate_limiter.wait()
+    response = session.get(club.agenda_url)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, "html.parser")
+    dropdown = soup.find(id="GotoAgenda")
+    if dropdown is None:
+        raise ValueError("Agenda dropdown not found; login was probably rejected")
+    return [(opt.get("value"), opt.get_text(strip=True)) for opt in dropdown.find_all("option")]
+
+
+def agenda_page_url(value, club):
+    if "/" in value or value.endswith(".html"):
+        return urljoin(club.agenda_url, value)
+    return club.agenda_page_url.format(value=value)
+
+
+def fetch_agenda_page(session, value, club):
+    club.rate_limiter.wait()
+    with time_phase("load"):
+        response = session.get(agenda_page_url(value, club))
+        response.raise_for_status()
+    html = response.text
+    if "MeetingAgenda" not in html:
+        raise ValueError(f"No agenda in response for {value}")
+    return html
+
+
+def fetch_agenda_pages(session, agenda_values, logs, club):
+    # Pages load concurrently (within the club's rate limit) but are yielded in input order.
+    # Only a few pages run ahead of the consumer, so a slow upload holds back fetching.
+    logs.append(f"🔄 Loading {len(agenda_values)} agendas ({SCRAPER_CONCURRENCY} at a time)")
+    remaining = iter(agenda_values)
+    pending = deque()
+
+    def submit(pool, count):
+        for value, date in islice(remaining, count):
+            pending.append((date, pool.submit(fetch_agenda_page, session, value, club)))
+
+    with ThreadPoolExecutor(max_workers=SCRAPER_CONCURRENCY) as pool:
+        try:
+            submit(pool, SCRAPER_CONCURRENCY * 2)
+            while pending:
+                date, future = pending.popleft()
+                html = future.result()
+                submit(pool, 1)
+                yield date, html
+        finally:
+            # Stopped early (failed fetch or upload): don't load the pages still queued
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,106 @@
+import threading
+import datetime
+import uuid
+from collections import OrderedDict
+from app.metrics import time_phase
+from app.clubs import clubs
+from app.utils.config import SYNC_CLUB_CONCURRENCY
+
+MAX_FINISHED_JOBS = 20
+
+# Clubs syncing at once; jobs started beyond this wait as "queued"
+_sync_slots = threading.BoundedSemaphore(SYNC_CLUB_CONCURRENCY)
+
+
+class SyncJob:
+    def __init__(self, club, full=False, after=None):
+        self.id = uuid.uuid4().hex
+        self.club = club
+        self.full = full
+        self.after = after  # the club's running job, which this one waits for
+        self.status = "queued"
+        self.logs = []  # appended to by the sync thread, read by status/stream requests
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.finished_at = None
+        self.done = threading.Event()
+
+    @property
+    def running(self):
+        return not self.done.is_set()
+
+    def to_dict(self, include_logs=True):
+        data = {
+            "job_id": self.id,
+            "club_id": self.club.id,
+            "status": self.status,
+            "full": self.full,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_logs:
+            data["logs"] = list(self.logs)
+        return data
+
+
+_jobs = OrderedDict()
+_current = {}  # club id -> latest job
+_lock = threading.Lock()
+
+
+def _run(job):
+    try:
+        if job.after is not None:
+            job.logs.append("⏳ Waiting for the running sync to finish first.")
+            job.after.done.wait()
+            job.after = None
+        with _sync_slots:
+            job.status = "running"
+            # Imported here so Selenium and the parser stack load on the first sync, not at startup
+            from app.scraper import fetch_and_save_agendas
+            with time_phase("sync"):
+                fetch_and_save_agendas(full=job.full, logs=job.logs, club=job.club)
+        # The scraper reports failures as ❌ log lines rather than raising
+        failed = any(line.startswith("❌") for line in job.logs)
+        job.status = "failed" if failed else "succeeded"
+    except Exception as e:
+        job.logs.append(f"❌ Error: {e}")
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.datetime.now(datetime.timezone.utc)
+        job.done.set()
+
+
+def _prune():
+    finished = [job_id for job_id, job in _jobs.items() if not job.running]
+    for job_id in finished[:max(0, len(_jobs) - MAX_FINISHED_JOBS)]:
+        del _jobs[job_id]
+
+
+def start_sync_job(club, full=False):
+    # Returns (job, created); a trigger while the club's sync is queued or running attaches to
+    # it, unless it asks for a full sync and that one is incremental: the full sync then runs
+    # after it
+    with _lock:
+        current = _current.get(club.id)
+        if current is not None and current.running:
+            if current.full or not full:
+                return current, False
+        else:
+            current = None
+
+        job = SyncJob(club, full=full, after=current)
+        _jobs[job.id] = job
+        _prune()
+        _current[club.id] = job
+
+    threading.Thread(target=_run, args=(job,), name=f"sync-{club.id}-{job.id}", daemon=True).start()
+    return job, True
+
+
+def start_sync_all(full=False):
+    # One job per club; at most SYNC_CLUB_CONCURRENCY of them run at a time
+    return [start_sync_job(club, full=full) for club in clubs.values()]
+
+
+def get_job(job_id):
+    return _jobs.get(job_id)
@@ -0,0 +1,87 @@
+import threading
+import time
+from app.storage import get_store
+from app.name_index import NameIndex
+from app.cache import response_cache, club_tags
+from app.club_cache import ClubCache
+from app.utils.config import MEMBER_CACHE_TTL, NAME_FUZZY_MAX_DISTANCE, DEFAULT_CLUB_ID
+
+
+class MemberDirectory:
+    # Immutable snapshot of the members table plus lookup structures built once per load
+    def __init__(self, names, version, aliases=None):
+        self.version = version
+        self.loaded_at = time.time()
+        self.names = tuple(sorted(set(n.strip() for n in names if n and n.strip())))
+        self.name_set = frozenset(self.names)
+        self.index = NameIndex(self.names, aliases, max_distance=NAME_FUZZY_MAX_DISTANCE)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.name_set
+
+
+_version = 0
+_lock = threading.Lock()
+
+
+def fetch_member_names(club_id=None):
+    return get_store(club_id).members.names()
+
+
+def fetch_member_aliases(club_id=None):
+    try:
+        return get_store(club_id).members.aliases()
+    except Exception as e:
+        print(f"⚠️ Could not load member aliases: {e}")
+        return {}
+
+
+def save_member_aliases(aliases, club_id=None):
+    # Persist names resolved by prefix so later syncs resolve them the same way
+    if not aliases:
+        return 0
+    return get_store(club_id).members.save_aliases(aliases)
+
+
+def _build_directory(club_id, previous):
+    global _version
+    names = fetch_member_names(club_id)
+    aliases = fetch_member_aliases(club_id)
+    with _lock:
+        _version += 1
+        directory = MemberDirectory(names, _version, aliases)
+
+    if previous is not None and previous.names != directory.names:
+        response_cache.invalidate(*club_tags(club_id, "members"))
+
+    if not directory.names:
+        print(f"⚠️ Failed to fetch members of {club_id} from storage or no members found.")
+    else:
+        print(f"✅ Fetched {len(directory)} known members of {club_id} from storage.")
+    return directory
+
+
+def _is_fresh(directory, club_id):
+    return directory is not None and time.time() - directory.loaded_at <= MEMBER_CACHE_TTL
+
+
+_directories = ClubCache(_build_directory, _is_fresh)
+
+
+def load_member_directory(club_id=None):
+    return _directories.reload(club_id or DEFAULT_CLUB_ID)
+
+
+def get_member_directory(club_id=None):
+    return _directories.get(club_id or DEFAULT_CLUB_ID)
+
+
+async def get_member_directory_async(club_id=None):
+    return await _directories.get_async(club_id or DEFAULT_CLUB_ID)
+
+
+def invalidate_member_directory(club_id=None):
+    _directories.pop(club_id or DEFAULT_CLUB_ID)
@@ -0,0 +1,128 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers a cached read (ms) up to a full agenda sync (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+
+class Histogram:
+    # Prometheus-style histogram with one series per label combination
+    def __init__(self, name, help, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            items = [(key, list(series)) for key, series in items]
+        for key, series in items:
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+            counts = series[:len(self.buckets)] + [series[-1]]
+            for bound, count in zip(bounds, counts):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(labels + [le])} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(labels)} {series[-1]}")
+        return lines
+
+
+def _labels(labels):
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time to produce a response.", ("method", "route", "status"),
+)
+storage_duration = Histogram(
+    "storage_query_duration_seconds", "Latency of storage calls.", ("backend", "table", "operation", "status"),
+)
+storage_queries_per_request = Histogram(
+    "storage_queries_per_request", "Storage calls made while serving one request.", ("route",), COUNT_BUCKETS,
+)
+sync_phase_duration = Histogram(
+    "sync_phase_duration_seconds", "Time spent in each agenda sync phase.", ("phase",),
+)
+REGISTRY = (request_duration, storage_duration, storage_queries_per_request, sync_phase_duration)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    # Storage calls of one request; shared with the worker threads and tasks it starts
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+    def server_timing(self):
+        total = (time.perf_counter() - self.started) * 1000
+        return f'app;dur={total:.1f}, db;dur={self.query_seconds * 1000:.1f};desc="{self.queries} queries"'
+
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request():
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+@contextmanager
+def time_query(backend, table, operation):
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        seconds = time.perf_counter() - start
+        storage_duration.observe(seconds, backend=backend, table=table, operation=operation, status=status)
+        timings = _current.get()
+        if timings is not None:
+            timings.add_query(seconds)
+
+
+@contextmanager
+def time_phase(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sync_phase_duration.observe(time.perf_counter() - start, phase=phase)
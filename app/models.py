@@ -1,9 +1,4 @@
 from supabase import create_client
-import os
-from dotenv import load_dotenv
+from app.utils.config import SUPABASE_URL, SUPABASE_KEY
 
-load_dotenv()
-
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-supabase = create_client(url, key)
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
@@ -0,0 +1,124 @@
+import re
+
+# Shorter names and first names alone are too ambiguous to guess at ("Tom" is one edit from "Tim")
+FUZZY_MIN_LENGTH = 5
+
+
+def normalize_key(name):
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+def edit_distance(a, b, max_distance):
+    # Banded Levenshtein; returns max_distance + 1 as soon as the bound is exceeded
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _rank(name):
+    # Most specific first: shortest full name, then alphabetical, so ties never depend on set order
+    return (len(name), name)
+
+
+class _Node:
+    __slots__ = ("children", "name", "best")
+
+    def __init__(self):
+        self.children = {}
+        self.name = None  # member whose full key ends here
+        self.best = None  # best-ranked member anywhere below this node
+
+
+class NameIndex:
+    def __init__(self, names, aliases=None, max_distance=2):
+        self.max_distance = max_distance
+        self.root = _Node()
+        self.exact = {}
+        self.by_first_letter = {}
+        self.learned = {}
+
+        for name in sorted(names):
+            key = normalize_key(name)
+            if not key or key in self.exact:
+                continue
+            self.exact[key] = name
+            self._insert(key, name)
+            self.by_first_letter.setdefault(key[0], []).append((key, name))
+
+        # Past resolutions only count while the member still exists
+        self.aliases = {
+            normalize_key(alias): name
+            for alias, name in (aliases or {}).items()
+            if normalize_key(name) in self.exact
+        }
+
+    def _insert(self, key, name):
+        node = self.root
+        path = [node]
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            path.append(node)
+        node.name = name
+        for visited in path:
+            if visited.best is None or _rank(name) < _rank(visited.best):
+                visited.best = name
+
+    def _prefix_match(self, key):
+        node = self.root
+        longest = None  # longest member name that is a whole-word prefix of the query
+        for i, ch in enumerate(key):
+            if node.name and ch == " ":
+                longest = node.name
+            node = node.children.get(ch)
+            if node is None:
+                return longest
+
+        # The query is a prefix of one or more members: prefer completions at a word
+        # boundary ("john" -> "John Smith" before "Johnny B")
+        word = node.children.get(" ")
+        return word.best if word is not None else node.best
+
+    def _fuzzy_match(self, key):
+        if len(key) < FUZZY_MIN_LENGTH or " " not in key:
+            return None
+        limit = self.max_distance if len(key) >= 8 else min(1, self.max_distance)
+        best = None
+        for member_key, name in self.by_first_letter.get(key[0], []):
+            distance = edit_distance(key, member_key, limit)
+            if distance <= limit:
+                candidate = (distance,) + _rank(name)
+                if best is None or candidate < best:
+                    best = candidate
+        return best[-1] if best else None
+
+    def resolve(self, name):
+        key = normalize_key(name)
+        if not key:
+            return None
+
+        member = self.exact.get(key) or self.aliases.get(key)
+        if member:
+            return member
+
+        member = self._prefix_match(key)
+        if member:
+            # Remember prefix resolutions so later syncs stay stable as members join
+            self.aliases[key] = member
+            self.learned[key] = member
+            return member
+        # Fuzzy matches are guesses: used for this agenda, never saved as aliases
+        return self._fuzzy_match(key)
@@ -1,48 +1,96 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from app.utils.cleaner import clean_name
-from app.models import supabase
+from app.members import get_member_directory
+from app.utils.config import PARSER_BACKEND
 
-def fetch_known_members():
-    response = supabase.table('members').select('name').execute()
+AGENDA_ROWS_SELECTOR = "table.agendaTable tbody tr"
+AGENDA_ROWS_XPATH = (
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' agendaTable ')]//tbody//tr"
+)
+MEMBER_NAME_XPATH = (
+    ".//*[contains(concat(' ', normalize-space(@class), ' '), ' fth-member-name ')]"
+)
 
-    # ✅ Proper check: no .error attribute, instead check if data is empty
-    if not response.data:
-        print(f"⚠️ Failed to fetch members from Supabase or no members found.")
-        return set()
 
-    known_names = set(item['name'].strip() for item in response.data if item.get('name'))
-    print(f"✅ Fetched {len(known_names)} known members from Supabase.")
-    return known_names
+def match_cleaned_name(name, directory):
+    member = directory.index.resolve(name)  # exact, alias, prefix, then fuzzy
+    if member:
+        return member
+    return clean_name(name.strip().lower())  # fallback
 
 
-def match_cleaned_name(name, known_names):
-    name = name.strip().lower()
-    for member in known_names:
-        member_clean = member.lower().strip()
-        if member_clean == name:  # Full exact match
-            return member
-        if member_clean.startswith(name):  # Partial prefix match
-            return member
-    return clean_name(name)  # fallback
-
-
-def parse_agenda_html(html, agenda_label="Unknown"):
-    soup = BeautifulSoup(html, "html.parser")
+def _rows_from_soup(soup):
+    rows = []
+    for row in soup.select(AGENDA_ROWS_SELECTOR):
+        cols = row.find_all("td")
+        if len(cols) < 2:
+            rows.append(None)
+            continue
+        role_tag = cols[1].find("b")
+        role = role_tag.get_text(strip=True) if role_tag else ""
+        name_tag = row.select_one(".fth-member-name")
+        name = name_tag.get_text(strip=True) if name_tag else ""
+        rows.append((role, name))
+    return rows
+
+
+def _element_text(element):
+    # Same result as BeautifulSoup's get_text(strip=True), which skips script and style text
+    return "".join(
+        text.strip() for text in element.xpath(".//text()[not(parent::script or parent::style)]")
+    )
+
+
+def _rows_from_lxml(html):
+    import lxml.html
+
+    tree = lxml.html.fromstring(html)
+    rows = []
+    for row in tree.xpath(AGENDA_ROWS_XPATH):
+        cols = row.xpath(".//td")
+        if len(cols) < 2:
+            rows.append(None)
+            continue
+        role_tag = cols[1].find(".//b")
+        role = _element_text(role_tag) if role_tag is not None else ""
+        name_tags = row.xpath(MEMBER_NAME_XPATH)
+        name = _element_text(name_tags[0]) if name_tags else ""
+        rows.append((role, name))
+    return rows
+
+
+# Each backend returns one entry per agenda table row: (role, name), or None for
+# rows with fewer than two cells, so row indexes match across backends
+PARSER_BACKENDS = {
+    "html.parser": lambda html: _rows_from_soup(BeautifulSoup(html, "html.parser")),
+    "lxml": lambda html: _rows_from_soup(BeautifulSoup(html, "lxml")),
+    "table": lambda html: _rows_from_soup(
+        BeautifulSoup(html, "lxml", parse_only=SoupStrainer("table", class_="agendaTable"))
+    ),
+    "xpath": _rows_from_lxml,
+}
+
+
+def extract_agenda_rows(html, backend=None):
+    backend = backend or PARSER_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return PARSER_BACKENDS[backend](html)
+
+
+def parse_agenda_html(html, agenda_label="Unknown", directory=None, backend=None):
     roles = []
 
-    # ✅ You need to fetch members here
-    known_names = fetch_known_members()
+    # ✅ Shared member directory (loaded once per sync run by the scraper)
+    if directory is None:
+        directory = get_member_directory()
 
-    rows = soup.select("table.agendaTable tbody tr")
+    rows = extract_agenda_rows(html, backend)
     timer_seen = False
 
     for index, row in enumerate(rows):
-        cols = row.find_all("td")
-        if len(cols) >= 2:
-            role_tag = cols[1].find("b")
-            role = role_tag.get_text(strip=True) if role_tag else ""
-            name_tag = row.select_one(".fth-member-name")
-            name = name_tag.get_text(strip=True) if name_tag else ""
+        if row is not None:
+            role, name = row
 
             normalized = normalize_role(role)
             if not normalized:
@@ -55,7 +103,7 @@ def parse_agenda_html(html, agenda_label="Unknown"):
                 else:
                     name_list = [name.strip()] if name.strip() else []
 
-                cleaned_names = [match_cleaned_name(n, known_names) for n in name_list]
+                cleaned_names = [match_cleaned_name(n, directory) for n in name_list]
 
                 if len(cleaned_names) >= 1:
                     roles.append(("Table Topics Evaluation odd #", cleaned_names[0], agenda_label, index))
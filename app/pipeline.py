@@ -0,0 +1,187 @@
+import json
+import hashlib
+import queue
+import threading
+from app.storage import get_store
+from app.parser import parse_agenda_html
+from app.snapshots import snapshot_records
+from app.cache import response_cache, club_tags
+from app.metrics import time_phase
+from app.history import refresh_history
+from app.utils.config import SYNC_UPLOAD_CHUNK, SYNC_FLUSH_SECONDS, DEFAULT_CLUB_ID
+
+_DONE = object()
+
+
+def agenda_content_hash(agenda_items):
+    payload = json.dumps(agenda_items, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def group_roles_by_date(all_roles):
+    agenda_by_date = {}
+    for role, name, meeting_date, sort_order in all_roles:
+        if meeting_date not in agenda_by_date:
+            agenda_by_date[meeting_date] = []
+        agenda_by_date[meeting_date].append({
+            "Role": role,
+            "Name": name,
+            "SortOrder": sort_order
+        })
+    return agenda_by_date
+
+
+def agenda_records(agenda_by_date, stored_hashes=None):
+    # One row per meeting date whose agenda differs from the stored one
+    records = []
+    for meeting_date, agenda_items in agenda_by_date.items():
+        content_hash = agenda_content_hash(agenda_items)
+        if stored_hashes and stored_hashes.get(meeting_date) == content_hash:
+            continue
+        records.append({
+            "meeting_date": meeting_date,
+            "agenda_json": agenda_items,  # Store full agenda as JSON array
+            "content_hash": content_hash
+        })
+    return records
+
+
+def store_agendas(store, club_id, all_roles, stored_hashes=None, chunk_size=None):
+    # Upsert the new or changed agendas among the roles, a bounded chunk per request, then
+    # drop the responses built from the old ones. Returns (agendas written, agendas unchanged).
+    agenda_by_date = group_roles_by_date(all_roles)
+    records = agenda_records(agenda_by_date, stored_hashes)
+    chunk_size = chunk_size or SYNC_UPLOAD_CHUNK
+    for start in range(0, len(records), chunk_size):
+        with time_phase("upload"):
+            if not store.agendas.upsert(records[start:start + chunk_size]):
+                raise RuntimeError("Upsert returned no data")
+    if records:
+        response_cache.invalidate(*club_tags(club_id, "agendas"))
+    return len(records), len(agenda_by_date) - len(records)
+
+
+def rebuild_history(club_id, logs):
+    # Rebuild the role history snapshot now, not on the next request that needs it
+    try:
+        history = refresh_history(club_id)
+        logs.append(f"📚 Rebuilt role history: {len(history)} roles of {len(history.names)} members.")
+    except Exception as e:
+        logs.append(f"⚠️ Could not rebuild role history: {e}")
+
+
+class AgendaPipeline:
+    # Streams a sync into storage. The fetcher put()s each page as soon as it loads; a
+    # background uploader parses it and writes agendas and snapshots in chunks of up to
+    # SYNC_UPLOAD_CHUNK meetings, then moves the club's checkpoint to the chunk's last date.
+    # Pages must arrive in date order for the checkpoint to mean "everything before is stored".
+    def __init__(self, club_id, logs, stored_hashes=None, directory=None, full=False, chunk_size=None):
+        self.club_id = club_id or DEFAULT_CLUB_ID
+        self.store = get_store(self.club_id)
+        self.logs = logs
+        self.stored_hashes = stored_hashes
+        self.directory = directory
+        self.full = full
+        self.chunk_size = chunk_size or SYNC_UPLOAD_CHUNK
+        # At most two chunks wait for the uploader; a fetcher further ahead blocks in put()
+        self.queue = queue.Queue(maxsize=self.chunk_size * 2)
+        self.fetched_through = None  # latest meeting date handed to the uploader
+        self.written_through = None  # latest meeting date whose chunk is stored
+        self.roles = 0
+        self.uploaded = 0
+        self.unchanged = 0
+        self.snapshots = 0
+        self.error = None
+        self._snapshot_hashes = None
+        self._snapshots_failed = False
+        self._thread = threading.Thread(target=self._upload_loop, name=f"upload-{self.club_id}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Write what was fetched even when the fetch failed, so the checkpoint covers it
+        self.close()
+        if exc_type is None:
+            self._check()
+        return False
+
+    def put(self, meeting_date, html):
+        while True:
+            self._check()
+            try:
+                self.queue.put((meeting_date, html), timeout=1)
+                break
+            except queue.Full:
+                pass
+        self.fetched_through = meeting_date
+
+    def close(self):
+        while self._thread.is_alive():
+            try:
+                self.queue.put(_DONE, timeout=1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+
+    def _check(self):
+        if self.error is not None:
+            raise RuntimeError(f"Upload failed: {self.error}")
+
+    def _upload_loop(self):
+        chunk = []
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=SYNC_FLUSH_SECONDS if chunk else None)
+                except queue.Empty:
+                    # Pages are arriving slowly; store what we have rather than wait for a full chunk
+                    self._write(chunk)
+                    chunk = []
+                    continue
+                if item is _DONE:
+                    break
+                chunk.append(item)
+                if len(chunk) >= self.chunk_size:
+                    self._write(chunk)
+                    chunk = []
+            self._write(chunk)
+        except Exception as e:
+            self.error = e
+
+    def _write(self, chunk):
+        if not chunk:
+            return
+        roles = []
+        for meeting_date, html in chunk:
+            with time_phase("parse"):
+                roles += parse_agenda_html(html, agenda_label=meeting_date, directory=self.directory)
+        self.roles += len(roles)
+
+        written, unchanged = store_agendas(self.store, self.club_id, roles, self.stored_hashes, self.chunk_size)
+        self.uploaded += written
+        self.unchanged += unchanged
+
+        self._write_snapshots(dict(chunk))
+
+        last_date = chunk[-1][0]
+        self.store.checkpoints.save(last_date, self.full)
+        self.written_through = last_date
+        self.logs.append(f"💾 Stored agendas through {last_date} ({written} new or changed)")
+
+    def _write_snapshots(self, pages):
+        # Raw HTML for offline re-parsing (python -m app.reparse); unchanged pages are skipped
+        if self._snapshots_failed:
+            return
+        try:
+            if self._snapshot_hashes is None:
+                self._snapshot_hashes = self.store.snapshots.hashes()
+            records = snapshot_records(pages, self._snapshot_hashes)
+            if records:
+                self.store.snapshots.save(records)
+                self.snapshots += len(records)
+        except Exception as e:
+            self._snapshots_failed = True
+            self.logs.append(f"⚠️ Could not store agenda snapshots: {e}")
@@ -0,0 +1,34 @@
+GAP_WARNING_DAYS = 21
+
+
+def build_progress_report(summary, members, today):
+    # `summary` is RoleHistory.summary(): member -> (roles held, last date, recent roles)
+    report = []
+    for name in members:
+        if name in summary:
+            total, last_date, recent = summary[name]
+            days_since = (today - last_date).days
+            gap = "✅" if days_since < GAP_WARNING_DAYS else f"❌ No roles in {days_since} days"
+        else:
+            total, last_date, recent, days_since = 0, None, [], None
+            gap = "🚫 Never assigned"
+
+        report.append({
+            "Name": name,
+            "Total": total,
+            "RecentRoles": recent,
+            "LastAssigned": str(last_date) if last_date else "—",
+            "Gap": gap,
+            "DaysSince": days_since,
+        })
+    return report
+
+
+def filter_report(report, min_gap_days=None, name=None):
+    if min_gap_days is not None:
+        # Members never assigned count as an infinite gap
+        report = [row for row in report if row["DaysSince"] is None or row["DaysSince"] > min_gap_days]
+    if name:
+        needle = name.strip().lower()
+        report = [row for row in report if needle in row["Name"].lower()]
+    return report
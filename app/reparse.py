@@ -0,0 +1,99 @@
+"""Rebuild the agendas table from stored HTML snapshots, without a browser or network.
+
+    python -m app.reparse [--club ID] [--workers N] [--full] [--dry-run]
+
+Run it after changing app/parser.py to apply the new parsing to every stored meeting.
+Snapshots are parsed in a process pool (one worker per core by default); like a sync,
+only agendas whose content hash changed are rewritten unless --full is given.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from app.members import MemberDirectory, fetch_member_names, fetch_member_aliases, save_member_aliases
+from app.parser import parse_agenda_html
+from app.pipeline import store_agendas, rebuild_history
+from app.snapshots import decompress_html
+from app.storage import get_store
+from app.utils.config import DEFAULT_CLUB_ID
+
+_directory = None
+
+
+def _init_worker(names, aliases):
+    # Each worker builds the name index once and reuses it for all of its pages
+    global _directory
+    _directory = MemberDirectory(names, version=0, aliases=aliases)
+
+
+def _parse_snapshot(snapshot):
+    meeting_date, html_gz = snapshot
+    with contextlib.redirect_stdout(io.StringIO()):
+        roles = parse_agenda_html(decompress_html(html_gz), agenda_label=meeting_date, directory=_directory)
+    return roles, dict(_directory.index.learned)
+
+
+def reparse_snapshots(club_id=None, workers=None, full=False, dry_run=False, logs=None):
+    if logs is None:
+        logs = []
+    store = get_store(club_id)
+    snapshots = [(item['meeting_date'], item['html_gz']) for item in store.snapshots.all()]
+    if not snapshots:
+        logs.append("ℹ️ No agenda snapshots stored yet; run a sync first.")
+        return logs
+
+    names = fetch_member_names(club_id)
+    aliases = fetch_member_aliases(club_id)
+    workers = workers or os.cpu_count() or 1
+    logs.append(f"🧩 Re-parsing {len(snapshots)} snapshots with {workers} workers")
+
+    all_roles = []
+    learned = {}
+    chunksize = max(1, len(snapshots) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(names, aliases)) as pool:
+        for roles, new_aliases in pool.map(_parse_snapshot, snapshots, chunksize=chunksize):
+            all_roles += roles
+            learned.update(new_aliases)
+    logs.append(f"✅ Parsed {len(all_roles)} roles")
+
+    if dry_run:
+        logs.append("⏭️ Dry run, nothing written.")
+        return logs
+
+    stored_hashes = None if full else store.agendas.content_hashes()
+    logs.append(f"📤 Uploading {len(all_roles)} roles to storage...")
+    try:
+        uploaded, unchanged = store_agendas(store, club_id or DEFAULT_CLUB_ID, all_roles, stored_hashes)
+    except Exception as e:
+        logs.append(f"❌ Upload failed: {e}")
+        return logs
+    if unchanged:
+        logs.append(f"⏭️ {unchanged} agendas unchanged since last sync.")
+    if uploaded:
+        logs.append(f"✅ Uploaded {uploaded} agendas (one per meeting date).")
+        rebuild_history(club_id, logs)
+    else:
+        logs.append("✅ Nothing to upload.")
+    saved = save_member_aliases(learned, club_id)
+    if saved:
+        logs.append(f"🔤 Saved {saved} member name aliases.")
+    return logs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--club", default=None, help="club id (default: DEFAULT_CLUB_ID)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--full", action="store_true", help="rewrite every agenda, not only changed ones")
+    parser.add_argument("--dry-run", action="store_true", help="parse but don't write")
+    args = parser.parse_args(argv)
+
+    for line in reparse_snapshots(args.club, args.workers, args.full, args.dry_run):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
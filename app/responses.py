@@ -0,0 +1,41 @@
+import gzip
+import brotli
+import orjson
+from fastapi.responses import JSONResponse
+
+# Compression levels for cached bodies, which are compressed once per entry and encoding
+BROTLI_QUALITY = 6
+GZIP_LEVEL = 6
+
+ENCODERS = {
+    "br": lambda body: brotli.compress(body, quality=BROTLI_QUALITY),
+    "gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL),
+}
+
+
+def dumps(content):
+    # Compact UTF-8 JSON, several times faster than json.dumps on agendas and reports
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+
+def choose_encoding(accept_encoding):
+    # Brotli if the client accepts it, then gzip; "q=0" opts out of a coding
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    for encoding in ENCODERS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    return ENCODERS[encoding](body)
@@ -1,12 +1,28 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
-from app.models import supabase
-from app.scraper import fetch_and_save_agendas
-from app.assignment import get_suggested_assignments
-from app.utils.constants import SKIP_ASSIGNMENT_ROLES
+from typing import List, Optional
+from app.storage import get_async_store
+from app.jobs import start_sync_job, start_sync_all, get_job
+from app.members import get_member_directory, get_member_directory_async, invalidate_member_directory
+from app.cache import cached_json_async, cached_entry, response_cache, club_tags, WithState
+from app.clubs import Club, clubs, get_club
+from app import metrics
+from app.utils.constants import PROGRESS_REPORT_FIELDS, ROLE_FREQUENCY_WINDOWS
 
 router = APIRouter()
+# Routes scoped to one club: mounted at the root for the default club and under /clubs/{club_id}
+club_router = APIRouter()
+
+
+def resolve_club(club_id: Optional[str] = None) -> Club:
+    club = get_club(club_id)
+    if club is None:
+        raise HTTPException(status_code=404, detail="Club not found")
+    return club
 
 # Pydantic model
 class Assignment(BaseModel):
@@ -14,193 +30,418 @@ class Assignment(BaseModel):
     role: str
     assigned: str
 
+# One row of the roster returned by /agenda/{meeting_date}
+class RosterSlot(BaseModel):
+    Role: str
+    Original: str = ""
+    Primary: str = ""
+    Backup: str = ""
+
+class RoleEdit(BaseModel):
+    roster: List[RosterSlot]  # as currently shown, including earlier edits
+    role: str
+    primary: Optional[str] = None  # pinned member; empty asks for a new suggestion
+
 @router.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
-# Sync agendas route
-@router.get("/sync_agendas")
-def sync_agendas():
-    logs = fetch_and_save_agendas()
-    return {"logs": logs}
-
-# Bulk assignment insert
-@router.post("/assignments/bulk")
-def save_assignments_bulk(payload: List[Assignment]):
+# Prometheus text format: request, storage query and sync phase histograms
+@router.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/clubs")
+async def list_clubs():
+    return {"clubs": [club.to_dict() for club in clubs.values()]}
+
+# Sync every club in the background, SYNC_CLUB_CONCURRENCY at a time
+@router.post("/clubs/sync", status_code=202)
+def start_sync_all_clubs(full: bool = Query(False, description="Re-fetch and rewrite every agenda")):
+    return {"jobs": [
+        {**job.to_dict(include_logs=False), "attached": not created}
+        for job, created in start_sync_all(full=full)
+    ]}
+
+# Sync agendas route (blocking; kept for existing clients)
+@club_router.get("/sync_agendas")
+def sync_agendas(
+    full: bool = Query(False, description="Re-fetch and rewrite every agenda"),
+    club: Club = Depends(resolve_club),
+):
+    job, _ = start_sync_job(club, full=full)
+    job.done.wait()
+    return {"logs": job.logs}
+
+# Start a background sync, or attach to the one already running
+@club_router.post("/sync_agendas", status_code=202)
+def start_sync(
+    full: bool = Query(False, description="Re-fetch and rewrite every agenda"),
+    club: Club = Depends(resolve_club),
+):
+    job, created = start_sync_job(club, full=full)
+    return {**job.to_dict(include_logs=False), "attached": not created}
+
+def find_job(job_id: str, club: Club = Depends(resolve_club)):
+    job = get_job(job_id)
+    if job is None or job.club.id != club.id:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+@club_router.get("/sync_agendas/{job_id}")
+def get_sync_status(job=Depends(find_job)):
+    return job.to_dict()
+
+# Server-sent events: one event per log entry, then a "done" event
+@club_router.get("/sync_agendas/{job_id}/events")
+async def stream_sync_logs(job=Depends(find_job)):
+    async def event_stream():
+        sent = 0
+        idle = 0.0
+        while True:
+            finished = not job.running
+            lines = job.logs[sent:]
+            for line in lines:
+                # A multi-line entry (e.g. a WebDriver stack trace) is one event of several data lines
+                yield "".join(f"data: {part}\n" for part in str(line).splitlines() or [""]) + "\n"
+            sent += len(lines)
+            if finished:
+                yield f"event: done\ndata: {json.dumps(job.to_dict(include_logs=False))}\n\n"
+                return
+            if lines:
+                idle = 0.0
+            elif idle >= 15:
+                yield ": keep-alive\n\n"  # stop proxies closing an idle stream
+                idle = 0.0
+            await asyncio.sleep(0.5)
+            idle += 0.5
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Bulk assignment save: one transactional diff in the store (see sql/004)
+@club_router.post("/assignments/bulk")
+async def save_assignments_bulk(payload: List[Assignment], club: Club = Depends(resolve_club)):
     try:
         records = [item.dict() for item in payload]
 
-        meeting_dates = list(set([record['meeting_date'] for record in records]))
-
-        # Delete existing records for these dates first
-        for date in meeting_dates:
-            supabase.table('assignments').delete().eq('meeting_date', date).execute()
+        store = get_async_store(club.id)
+        rows = await store.assignments.save_bulk(records)
 
-        # Insert new records
-        response = supabase.table('assignments').insert(records).execute()
+        changes = {"inserted": [], "updated": [], "removed": []}
+        for row in rows:
+            changes[row['action']].append({
+                "meeting_date": row['meeting_date'],
+                "role": row['role'],
+                "assigned": row['assigned']
+            })
 
-        return {"success": True, "data": response.data}
+        changed_dates = set(row['meeting_date'] for row in rows)
+        if changed_dates:
+            response_cache.invalidate(
+                *club_tags(club.id, "assignments", *(f"assignments:{date}" for date in changed_dates))
+            )
+
+        # "data" is the stored rows of the saved dates, with their ids, in payload order
+        dates = sorted(set(record['meeting_date'] for record in records))
+        stored = await asyncio.gather(*(store.assignments.for_date(meeting_date) for meeting_date in dates))
+        order = {(record['meeting_date'], record['role']): i for i, record in enumerate(records)}
+        data = sorted(
+            (row for rows in stored for row in rows),
+            key=lambda row: order.get((str(row['meeting_date']), row['role']), len(order)),
+        )
+        return {"success": True, "data": data, **changes}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # View assignments by date
-@router.get("/assignments")
-def get_assignments(meeting_date: str = Query(..., description="Date in YYYY-MM-DD format")):
+@club_router.get("/assignments")
+async def get_assignments(
+    meeting_date: str = Query(..., description="Date in YYYY-MM-DD format"),
+    club: Club = Depends(resolve_club),
+):
     try:
-        response = supabase.table('assignments').select("*").eq('meeting_date', meeting_date).execute()
-        return {"success": True, "data": response.data}
+        return {"success": True, "data": await get_async_store(club.id).assignments.for_date(meeting_date)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+def agenda_cache(club_id, meeting_date, seed, include_dates, dates_since):
+    # Response cache key and tags of GET /agenda/{meeting_date}; its entry keeps the
+    # MeetingState the roster was suggested from
+    key = (club_id, "agenda", meeting_date, seed, include_dates, dates_since)
+    return key, club_tags(club_id, "agendas", "members", f"assignments:{meeting_date}")
+
+async def build_agenda(club_id, meeting_date, seed, include_dates, dates_since):
+    from app.assignment import MeetingState, apply_saved_assignments
+    from app.history import get_history_async
+
+    store = get_async_store(club_id)
+    loads = [
+        store.agendas.get(meeting_date),
+        get_history_async(club_id),
+        get_member_directory_async(club_id),
+        store.assignments.for_date(meeting_date),
+    ]
+    if include_dates:
+        loads.append(store.agendas.dates(dates_since))
+    # Run the independent loads concurrently; latency is the slowest single query
+    agenda_data, history, directory, saved, *all_dates = await asyncio.gather(*loads)
+
+    if not agenda_data:
+        raise HTTPException(status_code=404, detail="Agenda not found")
+
+    # Saved assignments
+    saved_assignments = {item['role']: item['assigned'] for item in saved}
+
+    def suggest():
+        # Recent roles of each member before this date, kept with the meeting's costs
+        # for fast single-role edits (POST .../resuggest)
+        state = MeetingState(agenda_data, history.role_history(meeting_date), directory.names, meeting_date, seed)
+        return state, state.suggest()
+
+    # Get suggested assignments (CPU-bound, kept off the event loop)
+    state, suggested = await asyncio.to_thread(suggest)
+
+    # Override Primary if saved assignments exist
+    apply_saved_assignments(suggested, saved_assignments)
+
+    if not include_dates:
+        return WithState({"agenda": suggested}, state)
+    return WithState({
+        "allDates": all_dates[0],
+        "agenda": suggested
+    }, state)
+
 # Get agenda and saved assignments for a specific date
-@router.get("/agenda/{meeting_date}")
-def get_agenda(meeting_date: str):
-    try:
-        # Fetch agenda for selected date
-        agenda_res = supabase.table('agendas').select("*").eq('meeting_date', meeting_date).execute()
-        if not agenda_res.data:
-            raise HTTPException(status_code=404, detail="Agenda not found")
-
-        agenda_data = []
-        for item in agenda_res.data:
-            agenda_data.extend(item['agenda_json'])
-
-        # Fetch past agendas before this date
-        past_res = supabase.table('agendas').select("*").lt('meeting_date', meeting_date).execute()
-        past_data = []
-        for item in past_res.data:
-            for agenda_item in item['agenda_json']:
-                if agenda_item['Name']:
-                    past_data.append({
-                        'Name': agenda_item['Name'],
-                        'Role': agenda_item['Role'],
-                        'MeetingDate': item['meeting_date']
-                    })
-
-        # Fetch all members
-        members_res = supabase.table('members').select('name').execute()
-        members = [m['name'] for m in members_res.data if m['name']]
-
-        # Fetch saved assignments
-        assignments_res = supabase.table('assignments').select("*").eq('meeting_date', meeting_date).execute()
-        saved_assignments = {item['role']: item['assigned'] for item in assignments_res.data}
-
-        # Get all distinct dates
-        dates_res = supabase.table('agendas').select('meeting_date').execute()
-        all_dates = sorted(set(item['meeting_date'] for item in dates_res.data), reverse=True)
-
-        # Get suggested assignments
-        suggested = get_suggested_assignments(agenda_data, past_data, members)
-
-        # Override Primary if saved assignments exist
-        for item in suggested:
-            if item['Role'] in saved_assignments:
-                item['Primary'] = saved_assignments[item['Role']]
-
-        return {
-            "allDates": all_dates,
-            "agenda": suggested
-        }
+@club_router.get("/agenda/{meeting_date}")
+async def get_agenda(
+    meeting_date: str,
+    request: Request,
+    seed: Optional[int] = Query(None, description="Seed for reproducible suggestions"),
+    include_dates: bool = Query(True, description="Include allDates, every stored meeting date"),
+    dates_since: Optional[str] = Query(None, description="Only list meeting dates after this one (YYYY-MM-DD)"),
+    club: Club = Depends(resolve_club),
+):
+    async def build():
+        return await build_agenda(club.id, meeting_date, seed, include_dates, dates_since)
 
+    try:
+        key, tags = agenda_cache(club.id, meeting_date, seed, include_dates, dates_since)
+        return await cached_json_async(request, key, tags, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.get("/agendas/dates")
-def get_agenda_dates():
+# Re-suggest after one role is pinned or cleared: only the slots the edit affects change
+@club_router.post("/agenda/{meeting_date}/resuggest")
+async def resuggest_agenda(
+    meeting_date: str,
+    edit: RoleEdit,
+    seed: Optional[int] = Query(None, description="Seed the roster was suggested with"),
+    include_dates: bool = Query(True, description="include_dates the roster was requested with"),
+    dates_since: Optional[str] = Query(None, description="dates_since the roster was requested with"),
+    club: Club = Depends(resolve_club),
+):
+    from app.assignment import resuggest_roles
+
+    async def build():
+        return await build_agenda(club.id, meeting_date, seed, include_dates, dates_since)
+
     try:
-        response = supabase.table('agendas').select('meeting_date').execute()
-        dates = list(set([item['meeting_date'] for item in response.data]))
-        dates.sort(reverse=True)
-        return {"dates": dates}
+        # The state of the roster as served; a seeded one can be rebuilt exactly, an
+        # unseeded one can't once its response has left the cache
+        key, tags = agenda_cache(club.id, meeting_date, seed, include_dates, dates_since)
+        entry = await cached_entry(key, tags, build if seed is not None else None)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if entry is None:
+        raise HTTPException(status_code=409, detail="Suggestions have changed; reload the agenda and edit again")
+
+    roster = [item.dict() for item in edit.roster]
+    try:
+        updated = resuggest_roles(entry.state, roster, edit.role, edit.primary)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    changed = [new["Role"] for old, new in zip(roster, updated) if old != new]
+    return {"agenda": updated, "changed": changed}
+
+# Plan every meeting in a date range in one pass, each week aware of the ones before it
+@club_router.get("/agendas/plan")
+async def plan_agendas(
+    request: Request,
+    start: str = Query(..., description="First meeting date (YYYY-MM-DD)"),
+    end: str = Query(..., description="Last meeting date (YYYY-MM-DD)"),
+    seed: Optional[int] = Query(None, description="Seed for reproducible suggestions"),
+    club: Club = Depends(resolve_club),
+):
+    async def build():
+        from app.assignment import plan_meetings
+        from app.history import get_history_async
+
+        store = get_async_store(club.id)
+        agendas, history, directory, saved = await asyncio.gather(
+            store.agendas.between(start, end),
+            get_history_async(club.id),
+            get_member_directory_async(club.id),
+            store.assignments.between(start, end),
+        )
+
+        saved_by_date = {}
+        for item in saved:
+            saved_by_date.setdefault(item['meeting_date'], {})[item['role']] = item['assigned']
+
+        meetings = [
+            (item['meeting_date'], item['agenda_json'], saved_by_date.get(item['meeting_date'], {}))
+            for item in agendas
+        ]
+
+        def plan():
+            return plan_meetings(meetings, history.role_history(start), directory.names, seed=seed)
+
+        plan = await asyncio.to_thread(plan)
+        return {"plan": plan}
 
-@router.get("/members")
-def get_members():
     try:
-        response = supabase.table('members').select('name').execute()
-        members = sorted(set(item['name'] for item in response.data if item['name']))
-        return members
+        tags = club_tags(club.id, "agendas", "members", "assignments")
+        return await cached_json_async(request, (club.id, "agendas/plan", start, end, seed), tags, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/assignments/dates")
-def get_assignment_dates():
+@club_router.get("/agendas/dates")
+async def get_agenda_dates(
+    request: Request,
+    since: Optional[str] = Query(None, description="Only list meeting dates after this one (YYYY-MM-DD)"),
+    club: Club = Depends(resolve_club),
+):
+    async def build():
+        return {"dates": await get_async_store(club.id).agendas.dates(since)}
+
     try:
-        response = supabase.table('assignments').select('meeting_date').execute()
-        dates = list(set([item['meeting_date'] for item in response.data]))
-        dates.sort(reverse=True)
-        return {"dates": dates}
+        key = (club.id, "agendas/dates", since)
+        return await cached_json_async(request, key, club_tags(club.id, "agendas"), build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-from app.utils.constants import SKIP_ASSIGNMENT_ROLES  # If not already imported
+@club_router.get("/members")
+async def get_members(request: Request, club: Club = Depends(resolve_club)):
+    async def build():
+        return (await get_member_directory_async(club.id)).names
 
-@router.get("/members/progress")
-def get_member_progress():
     try:
-        df_roles = supabase.table('agendas').select("*").execute()
-        members_res = supabase.table('members').select('name').execute()
-
-        if not members_res.data:
-            return {"report": []}
-
-        import pandas as pd
-        from datetime import datetime
-
-        # All member names
-        all_members = sorted(set(item['name'] for item in members_res.data if item['name']))
-
-        # Flatten agenda_json
-        flat_rows = []
-        for record in df_roles.data:
-            meeting_date = record['meeting_date']
-            for item in record['agenda_json']:
-                if item.get('Name'):
-                    flat_rows.append({
-                        "Name": item['Name'],
-                        "Role": item['Role'],
-                        "MeetingDate": meeting_date
-                    })
-
-        df = pd.DataFrame(flat_rows)
-
-        if not df.empty:
-            # Apply skip roles filter
-            df = df[
-                ~(
-                    df["Role"].isin(SKIP_ASSIGNMENT_ROLES) |
-                    df["Role"].str.startswith("Theme for the meeting")
-                )
-            ]
-            df['MeetingDate'] = pd.to_datetime(df['MeetingDate'])
-
-        today = pd.Timestamp.today().normalize()
-        report = []
-
-        for name in all_members:
-            if not df.empty and name in df['Name'].values:
-                member_roles = df[df['Name'] == name].sort_values('MeetingDate', ascending=False)
-                total = len(member_roles)
-                recent = member_roles.head(3)['Role'].tolist()
-                last_date = member_roles['MeetingDate'].max().date()
-
-                days_since = (today.date() - last_date).days
-                gap = "✅" if days_since < 21 else f"❌ No roles in {days_since} days"
-            else:
-                total = 0
-                recent = []
-                last_date = None
-                gap = "🚫 Never assigned"
-
-            report.append({
-                "Name": name,
-                "Total": total,
-                "RecentRoles": recent,
-                "LastAssigned": str(last_date) if last_date else "—",
-                "Gap": gap
-            })
+        return await cached_json_async(request, (club.id, "members"), club_tags(club.id, "members"), build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return {"report": report}
+# Drop the cached member directory after editing the members table
+@club_router.post("/members/refresh")
+def refresh_members(club: Club = Depends(resolve_club)):
+    try:
+        invalidate_member_directory(club.id)
+        directory = get_member_directory(club.id)
+        response_cache.invalidate(*club_tags(club.id, "members"))
+        return {"count": len(directory), "version": directory.version}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@club_router.get("/assignments/dates")
+async def get_assignment_dates(request: Request, club: Club = Depends(resolve_club)):
+    async def build():
+        return {"dates": await get_async_store(club.id).assignments.dates()}
+
+    try:
+        key = (club.id, "assignments/dates")
+        return await cached_json_async(request, key, club_tags(club.id, "assignments"), build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@club_router.get("/members/progress")
+async def get_member_progress(
+    request: Request,
+    offset: int = Query(0, ge=0, description="Number of members to skip"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of members to return"),
+    min_gap_days: Optional[int] = Query(None, ge=0, description="Only members without a role for more than N days"),
+    name: Optional[str] = Query(None, description="Only members whose name contains this text"),
+    fields: Optional[str] = Query(None, description="Comma-separated report columns to return, e.g. Name,DaysSince"),
+    club: Club = Depends(resolve_club),
+):
+    today = date.today()
+    columns = tuple(field.strip() for field in fields.split(",") if field.strip()) if fields else None
+    unknown = set(columns or ()) - set(PROGRESS_REPORT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown report fields: {', '.join(sorted(unknown))}")
+
+    async def build():
+        from app.progress import build_progress_report, filter_report
+        from app.history import get_history_async
+
+        history, directory = await asyncio.gather(
+            get_history_async(club.id),
+            get_member_directory_async(club.id),
+        )
+
+        if not directory.names:
+            return {"report": [], "total": 0}
+
+        def compute():
+            report = build_progress_report(history.summary(), directory.names, today)
+            return filter_report(report, min_gap_days=min_gap_days, name=name)
+
+        report = await asyncio.to_thread(compute)
+
+        end = offset + limit if limit else None
+        page = report[offset:end]
+        if columns:
+            page = [{column: row[column] for column in columns} for row in page]
+        return {"report": page, "total": len(report)}
+
+    try:
+        # Gaps are relative to today, so the entry must not outlive the day
+        key = (club.id, "members/progress", str(today), offset, limit, min_gap_days, name, columns)
+        return await cached_json_async(request, key, club_tags(club.id, "agendas", "members"), build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# How often each member held each role, per month, quarter or year
+@club_router.get("/analytics/role_frequencies")
+async def get_role_frequencies(
+    request: Request,
+    window: str = Query("month", description="Period length: month, quarter or year"),
+    start: Optional[str] = Query(None, description="First meeting date to count (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Last meeting date to count (YYYY-MM-DD)"),
+    name: Optional[str] = Query(None, description="Only members whose name contains this text"),
+    club: Club = Depends(resolve_club),
+):
+    if window not in ROLE_FREQUENCY_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Unknown window: {window}")
+
+    async def build():
+        from app.history import get_history_async
+
+        history, directory = await asyncio.gather(
+            get_history_async(club.id),
+            get_member_directory_async(club.id),
+        )
+        periods, frequencies = await asyncio.to_thread(history.role_frequencies, window, start, end)
+
+        needle = name.strip().lower() if name else None
+        members = []
+        for member in directory.names:
+            if needle and needle not in member.lower():
+                continue
+            roles = frequencies.get(member, {})
+            total = sum(sum(counts) for counts in roles.values())
+            members.append({"Name": member, "Total": total, "Roles": roles})
+        return {"window": window, "periods": periods, "members": members}
+
+    try:
+        key = (club.id, "analytics/role_frequencies", window, start, end, name)
+        return await cached_json_async(request, key, club_tags(club.id, "agendas", "members"), build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+router.include_router(club_router)
+router.include_router(club_router, prefix="/clubs/{club_id}")
@@ -1,8 +1,5 @@
-import os
-import time
-import shutil
+import threading
 import datetime
-import pandas as pd
 from dateutil.parser import parse as parse_date
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -10,9 +7,17 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support import expected_conditions as EC
-from app.models import supabase
-from app.parser import parse_agenda_html
-from app.utils.config import CHROME_DRIVER_PATH, CLUB_NUMBER, PASSWORD, AGENDA_URL, TARGET_DATE
+from selenium.common.exceptions import TimeoutException
+from app.storage import get_store
+from app.members import load_member_directory, save_member_aliases
+from app.metrics import time_phase
+from app.pipeline import AgendaPipeline, rebuild_history
+from app import http_scraper
+from app.clubs import get_club
+from app.utils.config import CHROME_DRIVER_PATH, SYNC_REFRESH_DAYS, SCRAPER_BACKEND, BROWSER_SESSIONS
+
+# Headless Chrome is the heaviest part of a sync; clubs synced together share these slots
+_browser_slots = threading.BoundedSemaphore(BROWSER_SESSIONS)
 
 
 def setup_driver():
@@ -23,13 +28,14 @@ def setup_driver():
     return webdriver.Chrome(service=Service(CHROME_DRIVER_PATH), options=options)
 
 
-def login(driver, logs):
+def login(driver, logs, club):
     logs.append("🔐 Logging in...")
-    driver.get("https://hobart.toastmastersclubs.org")
+    club.rate_limiter.wait()
+    driver.get(club.url)
     WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "adminlogin"))).click()
     WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.ID, "clubnumber")))
-    driver.find_element(By.ID, "clubnumber").send_keys(CLUB_NUMBER)
-    driver.find_element(By.ID, "password").send_keys(PASSWORD)
+    driver.find_element(By.ID, "clubnumber").send_keys(club.number)
+    driver.find_element(By.ID, "password").send_keys(club.password)
     driver.find_element(By.XPATH, "//button[.//span[text()='Login']]").click()
     try:
         WebDriverWait(driver, 5).until(
@@ -40,16 +46,37 @@ def login(driver, logs):
     logs.append("✅ Login successful.")
 
 
-def fetch_agendas(driver, target_date, logs):
-    logs.append(f"📅 Fetching agendas up to {target_date}")
-    driver.get(AGENDA_URL)
-    WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "GotoAgenda")))
-    dropdown = driver.find_element(By.ID, "GotoAgenda")
+def fetch_stored_hashes(club_id=None):
+    return get_store(club_id).agendas.content_hashes()
+
+
+def resume_point(club_id, full, logs):
+    # Last meeting date stored by an interrupted sync of the same kind, if there is one
+    checkpoint = get_store(club_id).checkpoints.get()
+    if not checkpoint or checkpoint['full'] != full:
+        return None
+    logs.append(f"⏩ Resuming the interrupted sync after {checkpoint['last_date']}")
+    return checkpoint['last_date']
+
 
+def select_dates_to_fetch(agenda_values, target_date, stored_hashes=None):
+    candidates = [(value, date) for value, date in agenda_values if date <= target_date]
+    if not stored_hashes:
+        return candidates
+
+    # Agendas older than the refresh window are settled; only re-check recent ones
+    latest_stored = max(datetime.date.fromisoformat(d) for d in stored_hashes)
+    cutoff = latest_stored - datetime.timedelta(days=SYNC_REFRESH_DAYS)
+    return [
+        (value, date) for value, date in candidates
+        if str(date) not in stored_hashes or date >= cutoff
+    ]
+
+
+def parse_agenda_options(options, logs):
     agenda_values = []
-    for opt in dropdown.find_elements(By.TAG_NAME, "option"):
-        value = opt.get_attribute("value")
-        text = opt.text.strip()
+    for value, text in options:
+        text = (text or "").strip()
         if value and "View Another" not in text:
             try:
                 date = parse_date(text, fuzzy=True).date()
@@ -58,77 +85,134 @@ def fetch_agendas(driver, target_date, logs):
                 logs.append(f"⚠️ Could not parse date from: {text}")
 
     agenda_values.sort(key=lambda x: x[1])
-    all_roles = []
+    return agenda_values
+
+
+def plan_agenda_fetch(agenda_values, target_date, logs, stored_hashes=None, resume_after=None):
+    to_fetch = select_dates_to_fetch(agenda_values, target_date, stored_hashes)
+    skipped = sum(1 for _, date in agenda_values if date <= target_date) - len(to_fetch)
+    if skipped:
+        logs.append(f"⏭️ Skipping {skipped} agendas already stored")
+    if resume_after:
+        remaining = [(value, date) for value, date in to_fetch if str(date) > resume_after]
+        if len(remaining) < len(to_fetch):
+            logs.append(f"⏭️ Skipping {len(to_fetch) - len(remaining)} agendas stored before the last sync stopped")
+        to_fetch = remaining
+    return to_fetch
+
 
-    for value, date in agenda_values:
-        if date > target_date:
-            continue
+def fetch_agendas(driver, club, target_date, logs, pipeline, resume_after=None):
+    logs.append(f"📅 Fetching agendas up to {target_date}")
+    club.rate_limiter.wait()
+    driver.get(club.agenda_url)
+    WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "GotoAgenda")))
+    dropdown = driver.find_element(By.ID, "GotoAgenda")
+
+    options = [(opt.get_attribute("value"), opt.text) for opt in dropdown.find_elements(By.TAG_NAME, "option")]
+    agenda_values = parse_agenda_options(options, logs)
+    to_fetch = plan_agenda_fetch(agenda_values, target_date, logs, pipeline.stored_hashes, resume_after)
+
+    for value, date in to_fetch:
         logs.append(f"🔄 Loading agenda for {date}")
-        Select(driver.find_element(By.ID, "GotoAgenda")).select_by_value(value)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "MeetingAgenda")))
-        time.sleep(1)
-
-        html = driver.page_source
-        parsed_roles = parse_agenda_html(html, agenda_label=str(date))
-        all_roles += parsed_roles
-    return all_roles
-
-
-def save_to_supabase(all_roles, logs):
-    logs.append(f"📤 Uploading {len(all_roles)} roles to Supabase...")
-
-    # Group roles by meeting date
-    agenda_by_date = {}
-    for role, name, meeting_date, sort_order in all_roles:
-        if meeting_date not in agenda_by_date:
-            agenda_by_date[meeting_date] = []
-        agenda_by_date[meeting_date].append({
-            "Role": role,
-            "Name": name,
-            "SortOrder": sort_order
-        })
-
-    records = []
-    for meeting_date, agenda_items in agenda_by_date.items():
-        records.append({
-            "meeting_date": meeting_date,
-            "agenda_json": agenda_items  # Store full agenda as JSON array
-        })
-
-    # Clean up existing records for these dates
-    for meeting_date in agenda_by_date.keys():
-        supabase.table('agendas').delete().eq('meeting_date', meeting_date).execute()
-
-    # Insert new records (one per meeting date)
-    response = supabase.table('agendas').insert(records).execute()
-
-    if response.data:
-        logs.append(f"✅ Uploaded {len(records)} agendas (one per meeting date).")
-    else:
-        logs.append(f"❌ Bulk insert failed. No data returned.")
+        club.rate_limiter.wait()
+        with time_phase("load"):
+            previous = driver.find_elements(By.ID, "MeetingAgenda")
+            Select(driver.find_element(By.ID, "GotoAgenda")).select_by_value(value)
+            if previous:
+                # Wait for the old agenda to be replaced instead of sleeping a fixed second
+                try:
+                    WebDriverWait(driver, 5).until(EC.staleness_of(previous[0]))
+                except TimeoutException:
+                    pass
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "MeetingAgenda")))
+            html = driver.page_source
+        # Parsed and stored by the pipeline's uploader while the next agenda loads
+        pipeline.put(str(date), html)
+
+
+def fetch_agendas_http(club, target_date, logs, pipeline, resume_after=None):
+    with http_scraper.create_session() as session:
+        http_scraper.login(session, logs, club)
+        logs.append(f"📅 Fetching agendas up to {target_date}")
+        agenda_values = parse_agenda_options(http_scraper.list_agenda_options(session, club), logs)
+        to_fetch = plan_agenda_fetch(agenda_values, target_date, logs, pipeline.stored_hashes, resume_after)
+
+        for date, html in http_scraper.fetch_agenda_pages(session, to_fetch, logs, club):
+            pipeline.put(str(date), html)
+
+
+def fetch_agendas_selenium(club, target_date, logs, pipeline, resume_after=None):
+    if not _browser_slots.acquire(blocking=False):
+        logs.append("⏳ Waiting for a free browser session...")
+        _browser_slots.acquire()
+    try:
+        driver = setup_driver()
+        try:
+            with time_phase("login"):
+                login(driver, logs, club)
+            fetch_agendas(driver, club, target_date, logs, pipeline, resume_after)
+        finally:
+            driver.quit()
+            logs.append("👋 Closed browser.")
+    finally:
+        _browser_slots.release()
 
 
-def fetch_and_save_agendas(target_date=None):
-    logs = []
+def fetch_and_save_agendas(target_date=None, full=False, backend=None, logs=None, club=None, resume=True):
+    if logs is None:
+        logs = []
+    if club is None:
+        club = get_club()
 
     if target_date is None:
-        target_date = TARGET_DATE
+        target_date = club.target_date or datetime.date.today()
     if isinstance(target_date, str):
         target_date = datetime.datetime.strptime(target_date, "%Y-%m-%d").date()
 
-    driver = setup_driver()
+    stored_hashes = None if full else fetch_stored_hashes(club.id)
+    # Reload members once so every agenda in this run resolves names against the same list
+    directory = load_member_directory(club.id)
+    resume_after = resume_point(club.id, full, logs) if resume else None
+
+    # Agendas are written in chunks while later ones are still loading
+    pipeline = AgendaPipeline(club.id, logs, stored_hashes, directory, full)
     try:
-        login(driver, logs)
-        all_roles = fetch_agendas(driver, target_date, logs)
+        with pipeline:
+            fetched = False
+            if (backend or SCRAPER_BACKEND) == "http":
+                try:
+                    fetch_agendas_http(club, target_date, logs, pipeline, resume_after)
+                    fetched = True
+                except Exception as e:
+                    if pipeline.error is not None:
+                        raise
+                    logs.append(f"⚠️ HTTP fetch failed ({e}), falling back to Selenium.")
+            if not fetched:
+                # Pages the HTTP backend already handed over are not loaded again
+                fetch_agendas_selenium(club, target_date, logs, pipeline, pipeline.fetched_through or resume_after)
     except Exception as e:
         logs.append(f"❌ Error: {e}")
+        if pipeline.written_through:
+            logs.append(f"💾 Agendas through {pipeline.written_through} are stored; the next sync resumes after them.")
         return logs
-    finally:
-        driver.quit()
-        logs.append("👋 Closed browser.")
 
-    save_to_supabase(all_roles, logs)
-    logs.append(f"🎉 Done. Total roles fetched: {len(all_roles)}")
+    get_store(club.id).checkpoints.clear()
+    if pipeline.unchanged:
+        logs.append(f"⏭️ {pipeline.unchanged} agendas unchanged since last sync.")
+    if pipeline.uploaded:
+        logs.append(f"✅ Uploaded {pipeline.uploaded} agendas (one per meeting date).")
+        rebuild_history(club.id, logs)
+    else:
+        logs.append("✅ Nothing to upload.")
+    if pipeline.snapshots:
+        logs.append(f"🗜️ Stored {pipeline.snapshots} agenda HTML snapshots.")
+    try:
+        saved = save_member_aliases(directory.index.learned, club.id)
+        if saved:
+            logs.append(f"🔤 Saved {saved} new member name aliases.")
+    except Exception as e:
+        logs.append(f"⚠️ Could not save member aliases: {e}")
+    logs.append(f"🎉 Done. Total roles fetched: {pipeline.roles}")
     return logs
 
 
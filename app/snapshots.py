@@ -0,0 +1,25 @@
+import gzip
+import hashlib
+
+
+def html_hash(html):
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def compress_html(html):
+    return gzip.compress(html.encode("utf-8"), compresslevel=9)
+
+
+def decompress_html(data):
+    return gzip.decompress(data).decode("utf-8")
+
+
+def snapshot_records(pages, stored_hashes=None):
+    # Records for pages ({meeting_date: html}) whose HTML differs from the stored snapshot
+    records = []
+    for meeting_date, html in pages.items():
+        digest = html_hash(html)
+        if stored_hashes and stored_hashes.get(meeting_date) == digest:
+            continue
+        records.append({"meeting_date": meeting_date, "html_hash": digest, "html_gz": compress_html(html)})
+    return records
@@ -0,0 +1,82 @@
+import threading
+from app.storage.instrumented import instrument
+from app.utils.config import (
+    STORAGE_BACKEND, STORAGE_PATH, SUPABASE_URL, SUPABASE_KEY, SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT,
+    DEFAULT_CLUB_ID,
+)
+
+_root = None  # unscoped store; each club gets a view of it from for_club()
+_stores = {}
+_async_root = None
+_async_stores = {}
+_lock = threading.Lock()
+
+
+def create_store(backend=None, path=None):
+    backend = backend or STORAGE_BACKEND
+    if backend == "supabase":
+        from app.storage.supabase_store import SupabaseStore
+        return SupabaseStore(club_id=DEFAULT_CLUB_ID)
+    if backend == "sqlite":
+        from app.storage.sqlite_store import SQLiteStore
+        return SQLiteStore(path or STORAGE_PATH, club_id=DEFAULT_CLUB_ID)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def get_store(club_id=None):
+    # One store per club and process; the Supabase client is only created when that backend is used
+    global _root
+    club_id = club_id or DEFAULT_CLUB_ID
+    store = _stores.get(club_id)
+    if store is None:
+        with _lock:
+            if _root is None:
+                _root = create_store()
+            store = _stores.get(club_id)
+            if store is None:
+                store = _stores[club_id] = instrument(_root.for_club(club_id))
+    return store
+
+
+def set_store(store):
+    # Swap the process store, e.g. a seeded SQLiteStore for benchmarks
+    global _root, _async_root
+    with _lock:
+        _root = store
+        _stores.clear()
+        _async_root = None
+        _async_stores.clear()
+
+
+def get_async_store(club_id=None):
+    # Async counterpart of get_store() for the routes. Supabase gets its own pooled
+    # async client; other stores run their (already timed) calls on worker threads.
+    global _async_root
+    club_id = club_id or DEFAULT_CLUB_ID
+    async_store = _async_stores.get(club_id)
+    if async_store is None:
+        store = get_store(club_id)
+        with _lock:
+            async_store = _async_stores.get(club_id)
+            if async_store is None:
+                if store.backend == "supabase":
+                    from app.storage.async_supabase_store import AsyncSupabaseStore
+                    if _async_root is None:
+                        _async_root = AsyncSupabaseStore.connect(
+                            SUPABASE_URL, SUPABASE_KEY, SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT
+                        )
+                    async_store = instrument(_async_root.for_club(club_id))
+                else:
+                    from app.storage.threaded_store import ThreadedAsyncStore
+                    async_store = ThreadedAsyncStore(store)
+                _async_stores[club_id] = async_store
+    return async_store
+
+
+async def close_async_store():
+    global _async_root
+    with _lock:
+        root, _async_root = _async_root, None
+        _async_stores.clear()
+    if root is not None:
+        await root.aclose()
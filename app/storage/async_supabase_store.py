@@ -0,0 +1,160 @@
+import httpx
+from supabase import AsyncClientOptions, acreate_client
+
+
+class AsyncSupabaseClient:
+    # supabase-py's async client over one pooled httpx client, shared by every request.
+    # acreate_client() is a coroutine, so the client is created on first use.
+    def __init__(self, url, key, pool_size, timeout):
+        self.url = url
+        self.key = key
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout,
+        )
+        self._client = None
+
+    async def get(self):
+        if self._client is None:
+            options = AsyncClientOptions(httpx_client=self.http, auto_refresh_token=False, persist_session=False)
+            self._client = await acreate_client(self.url, self.key, options)
+        return self._client
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+class AsyncSupabaseAgendas:
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    async def get(self, meeting_date):
+        db = await self.client.get()
+        response = await (
+            db.table('agendas').select('agenda_json')
+            .eq('club_id', self.club_id).eq('meeting_date', meeting_date).execute()
+        )
+        if not response.data:
+            return None
+        agenda_data = []
+        for item in response.data:
+            agenda_data.extend(item['agenda_json'])
+        return agenda_data
+
+    async def dates(self, since=None):
+        db = await self.client.get()
+        query = db.table('agendas').select('meeting_date').eq('club_id', self.club_id)
+        if since:
+            query = query.gt('meeting_date', since)
+        return sorted(set(item['meeting_date'] for item in (await query.execute()).data), reverse=True)
+
+    async def all(self):
+        db = await self.client.get()
+        response = await (
+            db.table('agendas').select('meeting_date, agenda_json')
+            .eq('club_id', self.club_id).execute()
+        )
+        return response.data
+
+    async def between(self, start, end):
+        db = await self.client.get()
+        response = await (
+            db.table('agendas').select('meeting_date, agenda_json').eq('club_id', self.club_id)
+            .gte('meeting_date', start).lte('meeting_date', end).execute()
+        )
+        return response.data
+
+    async def content_hashes(self):
+        db = await self.client.get()
+        response = await (
+            db.table('agendas').select('meeting_date, content_hash')
+            .eq('club_id', self.club_id).execute()
+        )
+        return {item['meeting_date']: item.get('content_hash') for item in response.data}
+
+    async def upsert(self, records):
+        db = await self.client.get()
+        records = [{**record, 'club_id': self.club_id} for record in records]
+        response = await db.table('agendas').upsert(records, on_conflict='club_id,meeting_date').execute()
+        return len(response.data or [])
+
+
+class AsyncSupabaseMembers:
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    async def names(self):
+        db = await self.client.get()
+        response = await db.table('members').select('name').eq('club_id', self.club_id).execute()
+        return [item['name'] for item in response.data if item.get('name')]
+
+    async def aliases(self):
+        db = await self.client.get()
+        response = await (
+            db.table('member_aliases').select('alias, name')
+            .eq('club_id', self.club_id).execute()
+        )
+        return {item['alias']: item['name'] for item in response.data if item.get('alias') and item.get('name')}
+
+    async def save_aliases(self, aliases):
+        db = await self.client.get()
+        records = [{"club_id": self.club_id, "alias": alias, "name": name} for alias, name in aliases.items()]
+        await db.table('member_aliases').upsert(records, on_conflict='club_id,alias').execute()
+        return len(records)
+
+
+class AsyncSupabaseAssignments:
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    async def for_date(self, meeting_date):
+        db = await self.client.get()
+        response = await (
+            db.table('assignments').select('id, meeting_date, role, assigned')
+            .eq('club_id', self.club_id).eq('meeting_date', meeting_date).execute()
+        )
+        return response.data
+
+    async def between(self, start, end):
+        db = await self.client.get()
+        response = await (
+            db.table('assignments').select('meeting_date, role, assigned').eq('club_id', self.club_id)
+            .gte('meeting_date', start).lte('meeting_date', end).execute()
+        )
+        return response.data
+
+    async def dates(self):
+        db = await self.client.get()
+        response = await db.table('assignments').select('meeting_date').eq('club_id', self.club_id).execute()
+        return sorted(set(item['meeting_date'] for item in response.data), reverse=True)
+
+    async def save_bulk(self, records):
+        # One transactional diff on the server, see sql/004
+        db = await self.client.get()
+        response = await db.rpc('save_assignments', {'payload': records, 'club': self.club_id}).execute()
+        return response.data or []
+
+
+class AsyncSupabaseStore:
+    backend = "supabase"
+
+    def __init__(self, client, club_id="default"):
+        self.client = client
+        self.club_id = club_id
+        self.agendas = AsyncSupabaseAgendas(client, club_id)
+        self.members = AsyncSupabaseMembers(client, club_id)
+        self.assignments = AsyncSupabaseAssignments(client, club_id)
+
+    @classmethod
+    def connect(cls, url, key, pool_size, timeout, club_id="default"):
+        return cls(AsyncSupabaseClient(url, key, pool_size, timeout), club_id)
+
+    def for_club(self, club_id):
+        # Shares the connection pool
+        return AsyncSupabaseStore(self.client, club_id)
+
+    async def aclose(self):
+        await self.client.aclose()
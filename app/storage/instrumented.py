@@ -0,0 +1,35 @@
+import inspect
+from app import metrics
+
+
+class InstrumentedRepository:
+    # Times every repository call as storage_query_duration_seconds{backend, table, operation}
+    def __init__(self, repository, backend, table):
+        self._repository = repository
+        self._backend = backend
+        self._table = table
+
+    def __getattr__(self, name):
+        method = getattr(self._repository, name)
+        if not callable(method):
+            return method
+
+        if inspect.iscoroutinefunction(method):
+            async def call(*args, **kwargs):
+                with metrics.time_query(self._backend, self._table, name):
+                    return await method(*args, **kwargs)
+        else:
+            def call(*args, **kwargs):
+                with metrics.time_query(self._backend, self._table, name):
+                    return method(*args, **kwargs)
+        return call
+
+
+def instrument(store):
+    for table in ("agendas", "members", "assignments", "snapshots", "checkpoints"):
+        repository = getattr(store, table, None)
+        if repository is None:
+            continue
+        if not isinstance(repository, InstrumentedRepository):
+            setattr(store, table, InstrumentedRepository(repository, store.backend, table))
+    return store
@@ -0,0 +1,305 @@
+import json
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+create table if not exists agendas (
+    club_id text not null,
+    meeting_date text not null,
+    agenda_json text not null,
+    content_hash text,
+    primary key (club_id, meeting_date)
+);
+create table if not exists members (
+    club_id text not null,
+    name text not null,
+    primary key (club_id, name)
+);
+create table if not exists member_aliases (
+    club_id text not null,
+    alias text not null,
+    name text not null,
+    primary key (club_id, alias)
+);
+create table if not exists assignments (
+    id integer primary key autoincrement,
+    club_id text not null,
+    meeting_date text not null,
+    role text not null,
+    assigned text,
+    unique (club_id, meeting_date, role)
+);
+create index if not exists assignments_meeting_date on assignments (club_id, meeting_date);
+create table if not exists agenda_snapshots (
+    club_id text not null,
+    meeting_date text not null,
+    html_hash text not null,
+    html_gz blob not null,
+    fetched_at text not null default current_timestamp,
+    primary key (club_id, meeting_date)
+);
+create table if not exists sync_checkpoints (
+    club_id text primary key,
+    full_sync integer not null,
+    last_date text not null,
+    updated_at text not null default current_timestamp
+);
+"""
+
+
+class SQLiteDatabase:
+    # One connection shared by all threads (required for ":memory:"), serialized by a lock
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.conn.execute("pragma foreign_keys = on")
+            if path != ":memory:":
+                self.conn.execute("pragma journal_mode = wal")
+            self.conn.executescript(SCHEMA)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def transaction(self):
+        return _Transaction(self)
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.lock.acquire()
+        return self.db.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.db.conn.commit()
+            else:
+                self.db.conn.rollback()
+        finally:
+            self.db.lock.release()
+
+
+class SQLiteAgendas:
+    def __init__(self, db, club_id):
+        self.db = db
+        self.club_id = club_id
+
+    def get(self, meeting_date):
+        rows = self.db.query(
+            "select agenda_json from agendas where club_id = ? and meeting_date = ?", (self.club_id, meeting_date)
+        )
+        if not rows:
+            return None
+        return json.loads(rows[0]['agenda_json'])
+
+    def dates(self, since=None):
+        return [row['meeting_date'] for row in self.db.query(
+            "select meeting_date from agendas where club_id = ? and meeting_date > ? order by meeting_date desc",
+            (self.club_id, since or ""),
+        )]
+
+    def all(self):
+        return self._records(self.db.query(
+            "select meeting_date, agenda_json from agendas where club_id = ?", (self.club_id,)
+        ))
+
+    def between(self, start, end):
+        return self._records(self.db.query(
+            "select meeting_date, agenda_json from agendas where club_id = ? and meeting_date between ? and ?",
+            (self.club_id, start, end),
+        ))
+
+    def content_hashes(self):
+        return {row['meeting_date']: row['content_hash'] for row in self.db.query(
+            "select meeting_date, content_hash from agendas where club_id = ?", (self.club_id,)
+        )}
+
+    def upsert(self, records):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "insert into agendas (club_id, meeting_date, agenda_json, content_hash) values (?, ?, ?, ?) "
+                "on conflict (club_id, meeting_date) do update set "
+                "agenda_json = excluded.agenda_json, content_hash = excluded.content_hash",
+                [
+                    (self.club_id, record['meeting_date'], json.dumps(record['agenda_json']), record.get('content_hash'))
+                    for record in records
+                ],
+            )
+        return len(records)
+
+    @staticmethod
+    def _records(rows):
+        return [{'meeting_date': row['meeting_date'], 'agenda_json': json.loads(row['agenda_json'])} for row in rows]
+
+
+class SQLiteMembers:
+    def __init__(self, db, club_id):
+        self.db = db
+        self.club_id = club_id
+
+    def names(self):
+        return [row['name'] for row in self.db.query("select name from members where club_id = ? order by name", (self.club_id,))]
+
+    def aliases(self):
+        return {row['alias']: row['name'] for row in self.db.query(
+            "select alias, name from member_aliases where club_id = ?", (self.club_id,)
+        )}
+
+    def save_aliases(self, aliases):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "insert into member_aliases (club_id, alias, name) values (?, ?, ?) "
+                "on conflict (club_id, alias) do update set name = excluded.name",
+                [(self.club_id, alias, name) for alias, name in aliases.items()],
+            )
+        return len(aliases)
+
+    def add(self, names):
+        # Not part of the Supabase store; the members table there is edited by hand
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "insert or ignore into members (club_id, name) values (?, ?)", [(self.club_id, name) for name in names]
+            )
+
+
+class SQLiteAssignments:
+    def __init__(self, db, club_id):
+        self.db = db
+        self.club_id = club_id
+
+    def for_date(self, meeting_date):
+        return self.db.query(
+            "select id, meeting_date, role, assigned from assignments where club_id = ? and meeting_date = ?",
+            (self.club_id, meeting_date),
+        )
+
+    def between(self, start, end):
+        return self.db.query(
+            "select meeting_date, role, assigned from assignments where club_id = ? and meeting_date between ? and ?",
+            (self.club_id, start, end),
+        )
+
+    def dates(self):
+        return [row['meeting_date'] for row in self.db.query(
+            "select distinct meeting_date from assignments where club_id = ? order by meeting_date desc",
+            (self.club_id,),
+        )]
+
+    def save_bulk(self, records):
+        # Same diff as the save_assignments SQL function (sql/004), in one transaction
+        incoming = {}
+        for record in records:
+            incoming[(record['meeting_date'], record['role'])] = record['assigned']
+        dates = sorted(set(meeting_date for meeting_date, _ in incoming))
+
+        changes = []
+        with self.db.transaction() as conn:
+            existing = {}
+            for meeting_date in dates:
+                for row in conn.execute(
+                    "select role, assigned from assignments where club_id = ? and meeting_date = ?",
+                    (self.club_id, meeting_date),
+                ):
+                    existing[(meeting_date, row['role'])] = row['assigned']
+
+            for (meeting_date, role), assigned in existing.items():
+                if (meeting_date, role) not in incoming:
+                    conn.execute(
+                        "delete from assignments where club_id = ? and meeting_date = ? and role = ?",
+                        (self.club_id, meeting_date, role),
+                    )
+                    changes.append({'meeting_date': meeting_date, 'role': role, 'assigned': assigned, 'action': 'removed'})
+
+            for (meeting_date, role), assigned in incoming.items():
+                if (meeting_date, role) in existing and existing[(meeting_date, role)] == assigned:
+                    continue
+                action = 'updated' if (meeting_date, role) in existing else 'inserted'
+                conn.execute(
+                    "insert into assignments (club_id, meeting_date, role, assigned) values (?, ?, ?, ?) "
+                    "on conflict (club_id, meeting_date, role) do update set assigned = excluded.assigned",
+                    (self.club_id, meeting_date, role, assigned),
+                )
+                changes.append({'meeting_date': meeting_date, 'role': role, 'assigned': assigned, 'action': action})
+        return changes
+
+
+class SQLiteSnapshots:
+    def __init__(self, db, club_id):
+        self.db = db
+        self.club_id = club_id
+
+    def hashes(self):
+        return {row['meeting_date']: row['html_hash'] for row in self.db.query(
+            "select meeting_date, html_hash from agenda_snapshots where club_id = ?", (self.club_id,)
+        )}
+
+    def all(self):
+        return self.db.query(
+            "select meeting_date, html_hash, html_gz from agenda_snapshots where club_id = ? order by meeting_date",
+            (self.club_id,),
+        )
+
+    def save(self, records):
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "insert into agenda_snapshots (club_id, meeting_date, html_hash, html_gz) values (?, ?, ?, ?) "
+                "on conflict (club_id, meeting_date) do update set html_hash = excluded.html_hash, "
+                "html_gz = excluded.html_gz, fetched_at = current_timestamp",
+                [(self.club_id, record['meeting_date'], record['html_hash'], record['html_gz']) for record in records],
+            )
+        return len(records)
+
+
+class SQLiteCheckpoints:
+    def __init__(self, db, club_id):
+        self.db = db
+        self.club_id = club_id
+
+    def get(self):
+        rows = self.db.query("select full_sync, last_date from sync_checkpoints where club_id = ?", (self.club_id,))
+        if not rows:
+            return None
+        return {'full': bool(rows[0]['full_sync']), 'last_date': rows[0]['last_date']}
+
+    def save(self, last_date, full):
+        with self.db.transaction() as conn:
+            conn.execute(
+                "insert into sync_checkpoints (club_id, full_sync, last_date) values (?, ?, ?) "
+                "on conflict (club_id) do update set full_sync = excluded.full_sync, last_date = excluded.last_date, "
+                "updated_at = current_timestamp",
+                (self.club_id, int(full), last_date),
+            )
+
+    def clear(self):
+        with self.db.transaction() as conn:
+            conn.execute("delete from sync_checkpoints where club_id = ?", (self.club_id,))
+
+
+class SQLiteStore:
+    backend = "sqlite"
+
+    def __init__(self, path=":memory:", club_id="default", db=None):
+        self.db = db or SQLiteDatabase(path)
+        self.club_id = club_id
+        self.agendas = SQLiteAgendas(self.db, club_id)
+        self.members = SQLiteMembers(self.db, club_id)
+        self.assignments = SQLiteAssignments(self.db, club_id)
+        self.snapshots = SQLiteSnapshots(self.db, club_id)
+        self.checkpoints = SQLiteCheckpoints(self.db, club_id)
+
+    @property
+    def location(self):
+        # Where the data lives; None for an in-memory database that no other process can see
+        return None if self.db.path == ":memory:" else os.path.abspath(self.db.path)
+
+    def for_club(self, club_id):
+        # Same database, scoped to another club
+        return SQLiteStore(club_id=club_id, db=self.db)
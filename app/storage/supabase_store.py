@@ -0,0 +1,183 @@
+import base64
+import datetime
+
+
+class SupabaseAgendas:
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    def get(self, meeting_date):
+        response = (
+            self.client.table('agendas').select('agenda_json')
+            .eq('club_id', self.club_id).eq('meeting_date', meeting_date).execute()
+        )
+        if not response.data:
+            return None
+        agenda_data = []
+        for item in response.data:
+            agenda_data.extend(item['agenda_json'])
+        return agenda_data
+
+    def dates(self, since=None):
+        # `since` limits the result to meeting dates after it, for incremental date lists
+        query = self.client.table('agendas').select('meeting_date').eq('club_id', self.club_id)
+        if since:
+            query = query.gt('meeting_date', since)
+        return sorted(set(item['meeting_date'] for item in query.execute().data), reverse=True)
+
+    def all(self):
+        return (
+            self.client.table('agendas').select('meeting_date, agenda_json')
+            .eq('club_id', self.club_id).execute().data
+        )
+
+    def between(self, start, end):
+        return (
+            self.client.table('agendas').select('meeting_date, agenda_json').eq('club_id', self.club_id)
+            .gte('meeting_date', start).lte('meeting_date', end).execute().data
+        )
+
+    def content_hashes(self):
+        response = (
+            self.client.table('agendas').select('meeting_date, content_hash')
+            .eq('club_id', self.club_id).execute()
+        )
+        return {item['meeting_date']: item.get('content_hash') for item in response.data}
+
+    def upsert(self, records):
+        records = [{**record, 'club_id': self.club_id} for record in records]
+        response = self.client.table('agendas').upsert(records, on_conflict='club_id,meeting_date').execute()
+        return len(response.data or [])
+
+
+class SupabaseMembers:
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    def names(self):
+        response = self.client.table('members').select('name').eq('club_id', self.club_id).execute()
+        return [item['name'] for item in response.data if item.get('name')]
+
+    def aliases(self):
+        response = (
+            self.client.table('member_aliases').select('alias, name')
+            .eq('club_id', self.club_id).execute()
+        )
+        return {item['alias']: item['name'] for item in response.data if item.get('alias') and item.get('name')}
+
+    def save_aliases(self, aliases):
+        records = [{"club_id": self.club_id, "alias": alias, "name": name} for alias, name in aliases.items()]
+        self.client.table('member_aliases').upsert(records, on_conflict='club_id,alias').execute()
+        return len(records)
+
+
+class SupabaseAssignments:
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    def for_date(self, meeting_date):
+        return (
+            self.client.table('assignments').select('id, meeting_date, role, assigned')
+            .eq('club_id', self.club_id).eq('meeting_date', meeting_date).execute().data
+        )
+
+    def between(self, start, end):
+        return (
+            self.client.table('assignments').select('meeting_date, role, assigned').eq('club_id', self.club_id)
+            .gte('meeting_date', start).lte('meeting_date', end).execute().data
+        )
+
+    def dates(self):
+        response = (
+            self.client.table('assignments').select('meeting_date')
+            .eq('club_id', self.club_id).execute()
+        )
+        return sorted(set(item['meeting_date'] for item in response.data), reverse=True)
+
+    def save_bulk(self, records):
+        # One transactional diff on the server, see sql/004
+        return self.client.rpc('save_assignments', {'payload': records, 'club': self.club_id}).execute().data or []
+
+
+class SupabaseSnapshots:
+    # html_gz travels as base64 text, see sql/005
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    def hashes(self):
+        response = (
+            self.client.table('agenda_snapshots').select('meeting_date, html_hash')
+            .eq('club_id', self.club_id).execute()
+        )
+        return {item['meeting_date']: item['html_hash'] for item in response.data}
+
+    def all(self):
+        response = (
+            self.client.table('agenda_snapshots').select('meeting_date, html_hash, html_gz')
+            .eq('club_id', self.club_id).execute()
+        )
+        return [{**item, 'html_gz': base64.b64decode(item['html_gz'])} for item in response.data]
+
+    def save(self, records):
+        rows = [
+            {**record, 'club_id': self.club_id, 'html_gz': base64.b64encode(record['html_gz']).decode('ascii')}
+            for record in records
+        ]
+        self.client.table('agenda_snapshots').upsert(rows, on_conflict='club_id,meeting_date').execute()
+        return len(rows)
+
+
+class SupabaseCheckpoints:
+    # Progress of the club's last unfinished sync, see sql/007
+    def __init__(self, client, club_id):
+        self.client = client
+        self.club_id = club_id
+
+    def get(self):
+        response = (
+            self.client.table('sync_checkpoints').select('full_sync, last_date')
+            .eq('club_id', self.club_id).execute()
+        )
+        if not response.data:
+            return None
+        return {'full': response.data[0]['full_sync'], 'last_date': response.data[0]['last_date']}
+
+    def save(self, last_date, full):
+        self.client.table('sync_checkpoints').upsert(
+            {
+                'club_id': self.club_id,
+                'full_sync': full,
+                'last_date': last_date,
+                'updated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            },
+            on_conflict='club_id',
+        ).execute()
+
+    def clear(self):
+        self.client.table('sync_checkpoints').delete().eq('club_id', self.club_id).execute()
+
+
+class SupabaseStore:
+    backend = "supabase"
+
+    def __init__(self, client=None, club_id="default"):
+        if client is None:
+            from app.models import supabase as client
+        self.client = client
+        self.club_id = club_id
+        self.agendas = SupabaseAgendas(client, club_id)
+        self.members = SupabaseMembers(client, club_id)
+        self.assignments = SupabaseAssignments(client, club_id)
+        self.snapshots = SupabaseSnapshots(client, club_id)
+        self.checkpoints = SupabaseCheckpoints(client, club_id)
+
+    @property
+    def location(self):
+        return str(self.client.supabase_url)
+
+    def for_club(self, club_id):
+        return SupabaseStore(self.client, club_id)
@@ -0,0 +1,29 @@
+import asyncio
+
+
+class ThreadedRepository:
+    # Async view of a blocking repository; each call runs on a worker thread
+    def __init__(self, repository):
+        self._repository = repository
+
+    def __getattr__(self, name):
+        method = getattr(self._repository, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+
+class ThreadedAsyncStore:
+    # Used for the SQLite store: local queries are short, so a thread hop is enough
+    def __init__(self, store):
+        self.store = store
+        self.backend = store.backend
+        self.agendas = ThreadedRepository(store.agendas)
+        self.members = ThreadedRepository(store.members)
+        self.assignments = ThreadedRepository(store.assignments)
+        self.snapshots = ThreadedRepository(store.snapshots)
+
+    async def aclose(self):
+        pass
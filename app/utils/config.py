@@ -6,5 +6,79 @@ load_dotenv()
 CLUB_NUMBER = os.getenv("CLUB_NUMBER")
 PASSWORD = os.getenv("PASSWORD")
 CHROME_DRIVER_PATH = "./chromedriver.exe"
-AGENDA_URL = "https://hobart.toastmastersclubs.org/agenda.html"
-TARGET_DATE = "2025-07-08"
+CLUB_URL = os.getenv("CLUB_URL", "https://hobart.toastmastersclubs.org")
+AGENDA_URL = f"{CLUB_URL}/agenda.html"
+# Last meeting date a sync fetches (YYYY-MM-DD); unset means today
+TARGET_DATE = os.getenv("TARGET_DATE")
+
+# Clubs served by this API: CLUBS is a JSON list of objects (or CLUBS_FILE a path to one)
+# with "id", "number", "password", "url" and optionally "login_url", "agenda_url",
+# "agenda_page_url", "target_date" and "rate_limit". Without either, the single club
+# above (CLUB_NUMBER, PASSWORD, CLUB_URL) is served as DEFAULT_CLUB_ID.
+CLUBS = os.getenv("CLUBS")
+CLUBS_FILE = os.getenv("CLUBS_FILE")
+DEFAULT_CLUB_ID = os.getenv("DEFAULT_CLUB_ID", "default")
+
+# Clubs synced at the same time, browser sessions open at once across all of them,
+# and agenda site requests per second for each club
+SYNC_CLUB_CONCURRENCY = int(os.getenv("SYNC_CLUB_CONCURRENCY", 3))
+BROWSER_SESSIONS = int(os.getenv("BROWSER_SESSIONS", 1))
+SCRAPER_RATE_LIMIT = float(os.getenv("SCRAPER_RATE_LIMIT", 5))
+
+# Incremental sync: stored agendas older than this many days before the latest
+# stored meeting are treated as settled and not re-fetched
+SYNC_REFRESH_DAYS = int(os.getenv("SYNC_REFRESH_DAYS", 28))
+
+# Sync writes agendas as they are fetched, in chunks of up to SYNC_UPLOAD_CHUNK meetings;
+# a partial chunk is written once no page has arrived for SYNC_FLUSH_SECONDS
+SYNC_UPLOAD_CHUNK = int(os.getenv("SYNC_UPLOAD_CHUNK", 20))
+SYNC_FLUSH_SECONDS = float(os.getenv("SYNC_FLUSH_SECONDS", 2))
+
+# Agenda fetch backend: "selenium" (headless Chrome) or "http" (pooled session, concurrent
+# fetches). The HTTP login and page URLs are not yet confirmed against the live site, so it
+# is opt-in; it falls back to Selenium if it cannot log in or load an agenda.
+SCRAPER_BACKEND = os.getenv("SCRAPER_BACKEND", "selenium")
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", 4))
+SCRAPER_HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", 20))
+LOGIN_URL = os.getenv("LOGIN_URL", f"{CLUB_URL}/login.html")
+# Agenda page for a GotoAgenda option value that is not itself a URL
+AGENDA_PAGE_URL = os.getenv("AGENDA_PAGE_URL", AGENDA_URL + "?t={value}")
+
+# Seconds the in-process member directory is reused before reloading from Supabase
+MEMBER_CACHE_TTL = int(os.getenv("MEMBER_CACHE_TTL", 300))
+
+# Columnar role history used by suggestions, progress and analytics. It is rebuilt after a
+# sync writes agendas; every HISTORY_TTL seconds it is checked against the stored agendas
+# (picking up writes made by other processes). When HISTORY_DIR is set, snapshots are saved
+# there and memory-mapped by the next process if the stored agendas still match.
+HISTORY_TTL = int(os.getenv("HISTORY_TTL", 300))
+HISTORY_DIR = os.getenv("HISTORY_DIR", "")
+
+# Largest edit distance accepted when resolving misspelt member names on agendas
+NAME_FUZZY_MAX_DISTANCE = int(os.getenv("NAME_FUZZY_MAX_DISTANCE", 2))
+
+# Agenda HTML parser backend: "html.parser", "lxml", "table" (lxml, agenda table only)
+# or "xpath" (lxml tree without BeautifulSoup). All produce identical roles.
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "html.parser")
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# Connections kept by the shared async Supabase client used by the routes, and its
+# per-request timeout in seconds
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", 10))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", 10))
+
+# Maximum number of cached read responses (least recently used are evicted first)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+
+# Responses of at least this many bytes are sent brotli or gzip compressed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+
+# Storage backend: "supabase" (default) or "sqlite" for offline runs and load tests.
+# STORAGE_PATH is the SQLite database file; ":memory:" keeps everything in-process.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+STORAGE_PATH = os.getenv("STORAGE_PATH", ":memory:")
+
+# Import the assignment, progress and scraper modules in a background thread after
+# startup, so the first real request after a cold start doesn't pay for them
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
@@ -17,3 +17,12 @@ SKIP_ASSIGNMENT_ROLES = {
     "Forward Planning",
     "Awards and Meeting Close"
 }
+
+# Number of most recent roles per member the assignment engine looks at
+RECENT_ROLES_PER_MEMBER = 3
+
+# Columns of a /members/progress row, in order
+PROGRESS_REPORT_FIELDS = ("Name", "Total", "RecentRoles", "LastAssigned", "Gap", "DaysSince")
+
+# Period lengths accepted by /analytics/role_frequencies
+ROLE_FREQUENCY_WINDOWS = ("month", "quarter", "year")
@@ -0,0 +1,35 @@
+import importlib
+import threading
+import time
+
+# Heavy modules kept off the startup path (numpy, Selenium, BeautifulSoup)
+WARMUP_MODULES = ("app.assignment", "app.history", "app.progress", "app.scraper")
+
+timings = {}
+
+
+def warm_up(modules=WARMUP_MODULES):
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"⚠️ Warm-up import of {name} failed: {e}")
+            continue
+        timings[name] = time.perf_counter() - start
+
+    # Builds the Supabase client (or opens SQLite) before the first data request needs it
+    from app.storage import get_store
+    start = time.perf_counter()
+    try:
+        get_store()
+        timings["storage"] = time.perf_counter() - start
+    except Exception as e:
+        print(f"⚠️ Warm-up of storage failed: {e}")
+    print("🔥 Warm-up imports: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+
+
+def start_warm_up():
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
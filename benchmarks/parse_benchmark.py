@@ -0,0 +1,74 @@
+"""Per-page parse time for each parser backend over the fixture corpus.
+
+    python -m benchmarks.parse_benchmark [--repeat 20] [--backend lxml ...]
+
+Every backend must produce exactly the same role tuples as "html.parser";
+the script exits non-zero if any page differs.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from app.members import MemberDirectory
+from app.parser import PARSER_BACKENDS, parse_agenda_html
+
+FIXTURES = Path(__file__).parent / "fixtures"
+REFERENCE_BACKEND = "html.parser"
+
+
+def load_corpus():
+    pages = [(path.stem.replace("agenda_", ""), path.read_text(encoding="utf-8"))
+             for path in sorted(FIXTURES.glob("agenda_*.html"))]
+    names = (FIXTURES / "members.txt").read_text(encoding="utf-8").splitlines()
+    return pages, names
+
+
+def parse_quietly(html, label, names, backend):
+    # Fresh directory per parse so alias learning in one run can't change the next
+    directory = MemberDirectory(names, version=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_agenda_html(html, agenda_label=label, directory=directory, backend=backend)
+
+
+def time_page(html, label, names, backend, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_quietly(html, label, names, backend)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", action="append", choices=sorted(PARSER_BACKENDS))
+    args = parser.parse_args(argv)
+
+    pages, names = load_corpus()
+    backends = args.backend or list(PARSER_BACKENDS)
+    expected = {label: parse_quietly(html, label, names, REFERENCE_BACKEND) for label, html in pages}
+
+    mismatches = 0
+    print(f"{len(pages)} pages, median of {args.repeat} runs (ms per page)\n")
+    print(f"{'backend':<12} {'mean':>8} {'min':>8} {'max':>8}  output")
+    for backend in backends:
+        timings = []
+        identical = True
+        for label, html in pages:
+            if parse_quietly(html, label, names, backend) != expected[label]:
+                identical = False
+            timings.append(time_page(html, label, names, backend, args.repeat) * 1000)
+        mismatches += not identical
+        print(f"{backend:<12} {statistics.mean(timings):8.2f} {min(timings):8.2f} {max(timings):8.2f}"
+              f"  {'identical' if identical else 'DIFFERS'}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
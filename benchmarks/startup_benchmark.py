@@ -0,0 +1,90 @@
+"""Cold-start cost: import time per module and time to the first /health response.
+
+    python -m benchmarks.startup_benchmark [--top 15] [--repeat 3]
+
+Each run starts a fresh interpreter, so nothing is shared with earlier runs.
+Uvicorn is started with WARMUP_ON_STARTUP=false to time the bare startup path.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module="main"):
+    # Parses `python -X importtime`: "import time: self [us] | cumulative | imported package"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative) / 1_000_000
+    return timings
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_health(timeout=60):
+    port = free_port()
+    env = {**os.environ, "WARMUP_ON_STARTUP": "false"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError("uvicorn exited before answering /health")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("no /health response before timeout")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    timings = import_times()
+    print(f"import main: {timings.get('main', 0) * 1000:.0f} ms cumulative\n")
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    top_level = {name: seconds for name, seconds in timings.items() if "." not in name}
+    for name, seconds in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<40} {seconds * 1000:14.1f}")
+
+    for name in ("app.scraper", "app.progress", "app.assignment", "supabase", "selenium", "numpy"):
+        if name in timings:
+            print(f"⚠️ {name} is imported at startup")
+
+    samples = [time_to_first_health() for _ in range(args.repeat)]
+    print(f"\nfirst /health response: median {statistics.median(samples) * 1000:.0f} ms"
+          f" over {args.repeat} cold starts")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
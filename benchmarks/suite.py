@@ -0,0 +1,198 @@
+"""Hot-path benchmarks on synthetic clubs, checked against stored baselines.
+
+    python -m benchmarks.suite [--scale small ...] [--repeat 5] [--update-baseline]
+
+Runs against an in-memory SQLite store, so no Supabase project or network is needed.
+Each benchmark reports the median time per call and the peak memory of one call
+(tracemalloc). The script exits non-zero if any time or peak memory exceeds its
+baseline in baselines.json by more than --tolerance. Baselines are machine specific;
+regenerate them with --update-baseline after an intended change or on new hardware.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("WARMUP_ON_STARTUP", "false")
+# Keep role history snapshots in memory: a run must neither read nor leave files behind
+os.environ["HISTORY_DIR"] = ""
+
+from fastapi.testclient import TestClient
+
+import main
+from app.assignment import MeetingState, get_suggested_assignments, resuggest_roles
+from app.cache import response_cache
+from app.history import RoleHistory, invalidate_history, refresh_history
+from app.members import MemberDirectory, invalidate_member_directory
+from app.parser import match_cleaned_name, parse_agenda_html
+from app.storage import set_store
+from app.storage.sqlite_store import SQLiteStore
+from benchmarks.synthetic import make_club, noisy_name, render_agenda_html
+
+BASELINES = Path(__file__).parent / "baselines.json"
+
+# name -> (members, years of weekly meetings)
+SCALES = {
+    "small": (30, 1),
+    "medium": (80, 3),
+    "large": (200, 10),
+}
+PARSE_PAGES = 20
+NAME_SAMPLES = 500
+# Absolute slack on top of --tolerance, so sub-millisecond timings don't fail on noise
+SLACK = {"seconds": 0.0005, "peak_kib": 64}
+
+
+class Club:
+    def __init__(self, scale, seed=0):
+        members, years = SCALES[scale]
+        self.names, self.records = make_club(members, years, seed)
+        rng = random.Random(seed)
+        recent = self.records[-PARSE_PAGES:]
+        self.pages = [
+            (record["meeting_date"], render_agenda_html(record["agenda_json"], record["meeting_date"], rng))
+            for record in recent
+        ]
+        self.raw_names = [
+            noisy_name(item["Name"], rng)
+            for record in recent for item in record["agenda_json"] if item["Name"]
+        ]
+        self.raw_names = (self.raw_names * (NAME_SAMPLES // max(len(self.raw_names), 1) + 1))[:NAME_SAMPLES]
+        self.latest = self.records[-1]["meeting_date"]
+
+        store = SQLiteStore()
+        store.members.add(self.names)
+        store.agendas.upsert(self.records)
+        set_store(store)
+        invalidate_member_directory()
+        invalidate_history()
+        response_cache.clear()
+        self.client = TestClient(main.app)
+
+    def directory(self):
+        return MemberDirectory(self.names, version=0)
+
+    def role_history(self):
+        # What /agenda/{date} suggests from: recent roles per member before the latest meeting
+        return RoleHistory.from_agendas(self.records).role_history(self.latest)
+
+
+def get_ok(client, url):
+    response_cache.clear()  # measure the real work, not a cache hit
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {url} returned {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def benchmarks(club):
+    # name -> (callable, calls it makes); reported times are per call
+    directory = club.directory()
+    history = club.role_history()
+    agenda = club.records[-1]["agenda_json"]
+    state = MeetingState(agenda, history, club.names, meeting_date=club.latest, seed=1)
+    roster = get_suggested_assignments(agenda, history, club.names, seed=1, meeting_date=club.latest)
+    # Pin the second slot's primary onto the first slot: two primaries and a backup move
+    edited_role, pinned = roster[0]["Role"], roster[1]["Primary"]
+
+    def parse_pages():
+        for label, page in club.pages:
+            parse_agenda_html(page, agenda_label=label, directory=directory)
+
+    def match_names():
+        for name in club.raw_names:
+            match_cleaned_name(name, directory)
+
+    return {
+        "parse_agenda_html": (parse_pages, len(club.pages)),
+        "match_cleaned_name": (match_names, len(club.raw_names)),
+        "get_suggested_assignments": (
+            lambda: get_suggested_assignments(agenda, history, club.names, seed=1, meeting_date=club.latest), 1,
+        ),
+        "resuggest_role": (lambda: resuggest_roles(state, roster, edited_role, pinned), 1),
+        "rebuild_role_history": (refresh_history, 1),
+        "get_member_progress": (lambda: get_ok(club.client, "/members/progress"), 1),
+        "get_agenda": (lambda: get_ok(club.client, f"/agenda/{club.latest}?seed=1"), 1),
+    }
+
+
+def measure(fn, calls, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # warm up imports and caches
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) / calls)
+
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"seconds": statistics.median(samples), "peak_kib": peak / 1024}
+
+
+def regressions(results, baselines, tolerance):
+    failed = []
+    for scale, by_name in results.items():
+        for name, result in by_name.items():
+            baseline = baselines.get(scale, {}).get(name)
+            if baseline is None:
+                continue
+            for field in ("seconds", "peak_kib"):
+                if result[field] > baseline[field] * (1 + tolerance) + SLACK[field]:
+                    failed.append(f"{scale}/{name} {field}: {result[field]:.6g} > baseline {baseline[field]:.6g}")
+    return failed
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", action="append", choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--tolerance", type=float, default=1.0, help="allowed slowdown, 1.0 = twice the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'scale':<8} {'benchmark':<28} {'ms/call':>10} {'peak KiB':>10}")
+    for scale in args.scale or list(SCALES):
+        club = Club(scale)
+        results[scale] = {}
+        for name, (fn, calls) in benchmarks(club).items():
+            result = measure(fn, calls, args.repeat)
+            results[scale][name] = result
+            print(f"{scale:<8} {name:<28} {result['seconds'] * 1000:10.3f} {result['peak_kib']:10.0f}")
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    if args.update_baseline:
+        for scale, by_name in results.items():
+            baselines[scale] = {
+                name: {"seconds": round(r["seconds"], 6), "peak_kib": round(r["peak_kib"], 1)}
+                for name, r in by_name.items()
+            }
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaselines written to {BASELINES.name}")
+        return 0
+
+    failed = regressions(results, baselines, args.tolerance)
+    if failed:
+        print("\nRegressions:")
+        for line in failed:
+            print(f"  {line}")
+        return 1
+    print("\nNo regressions." if baselines else "\nNo baselines yet; run with --update-baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
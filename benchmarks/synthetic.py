@@ -0,0 +1,131 @@
+"""Synthetic club data: members, weekly agendas shaped like `agenda_json`, agenda HTML.
+
+Everything is derived from a seed, so the same scale always produces the same club.
+"""
+import datetime
+import html
+import random
+
+FIRST_NAMES = [
+    "Alex", "Bella", "Carlos", "Dana", "Eli", "Fatima", "George", "Hana", "Ivan", "Jade",
+    "Kevin", "Lena", "Mateo", "Nora", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tara",
+    "Umar", "Vera", "Wei", "Ximena", "Yusuf", "Zoe",
+]
+LAST_NAMES = [
+    "Morgan", "Chen", "Rivera", "Whitfield", "Novak", "Haddad", "Papadopoulos", "Kim",
+    "Petrov", "Nguyen", "O'Brien", "Schmidt", "Garcia", "Lindqvist", "Farouk", "Sharma",
+    "Walsh", "Costa", "Okafor", "Singh", "Siddiqui", "Ivanova", "Zhang", "Lopez",
+]
+
+# (role, assignable) for each row of a regular meeting, in agenda order
+AGENDA_TEMPLATE = [
+    ("President's welcome", True),
+    ("Arrival and bar orders", False),
+    ("Call to order", True),
+    ("Theme for the meeting: {theme}", False),
+    ("Toastmaster", True),
+    ("Word of the day", True),
+    ("Timer", True),
+    ("Grammarian", True),
+    ("Ah counter", True),
+    ("Hark Master", True),
+    ("Speaker 1", True),
+    ("Speaker 2", True),
+    ("Speaker 3", True),
+    ("Reserve speaker", True),
+    ("Prepared Speech vote", False),
+    ("Break", False),
+    ("Table Topics", True),
+    ("Table Topics Evaluation", True),
+    ("Table Topics Vote", False),
+    ("Evaluator 1", True),
+    ("Evaluator 2", True),
+    ("Evaluator 3", True),
+    ("Evaluator Vote", False),
+    ("General Evaluation", True),
+    ("Timer report", False),
+    ("Forward Planning", False),
+    ("Awards and Meeting Close", True),
+]
+THEMES = ["Winter", "Beginnings", "Travel", "Courage", "Food", "Music", "Change", "Home"]
+FILL_RATE = 0.85
+
+
+def make_members(count, seed=0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        if len(names) == len(FIRST_NAMES) * len(LAST_NAMES):
+            break
+    return sorted(names)
+
+
+def meeting_dates(years, end=datetime.date(2026, 6, 30)):
+    # Weekly meetings, oldest first
+    weeks = int(years * 52)
+    return [end - datetime.timedelta(weeks=weeks - 1 - i) for i in range(weeks)]
+
+
+def make_agenda(members, rng):
+    items = []
+    theme = rng.choice(THEMES)
+    for sort_order, (role, assignable) in enumerate(AGENDA_TEMPLATE):
+        role = role.format(theme=theme)
+        name = rng.choice(members) if assignable and rng.random() < FILL_RATE else ""
+        items.append({"Role": role, "Name": name, "SortOrder": sort_order})
+    return items
+
+
+def make_club(members=60, years=3, seed=0):
+    # Returns (member names, agenda records as stored: meeting_date + agenda_json)
+    names = make_members(members, seed)
+    rng = random.Random(seed + 1)
+    records = [
+        {"meeting_date": str(meeting_date), "agenda_json": make_agenda(names, rng)}
+        for meeting_date in meeting_dates(years)
+    ]
+    return names, records
+
+
+def noisy_name(name, rng):
+    # The ways names show up on real agenda pages: extra text, case, typos, first name only
+    kind = rng.random()
+    if kind < 0.6:
+        return name
+    if kind < 0.7:
+        return f"{name} Path: Presentation Mastery Level 2"
+    if kind < 0.8:
+        return name.lower()
+    if kind < 0.9 and len(name) > 4:
+        i = rng.randrange(1, len(name) - 1)
+        return name[:i] + name[i + 1:]
+    return name.split()[0]
+
+
+def render_agenda_html(agenda_items, meeting_date, rng, padding_rules=200):
+    # Page shaped like the club site's agenda: a large style block and one agendaTable
+    rows = []
+    for item in agenda_items:
+        if item["Name"]:
+            presenter = f'<span class="fth-member-name">{html.escape(noisy_name(item["Name"], rng))}</span>'
+        else:
+            presenter = '<span class="fth-open-role">Open</span>'
+        rows.append(
+            '<tr class="agendaRow">\n'
+            f'  <td class="agendaTime">7:{item["SortOrder"]:02d} PM</td>\n'
+            f'  <td class="agendaRole"><b>{html.escape(item["Role"])}</b></td>\n'
+            f'  <td class="agendaPresenter">{presenter}</td>\n'
+            '</tr>'
+        )
+    styles = "\n".join(f".c{i} {{ margin: {i % 7}px; padding: {i % 5}px; }}" for i in range(padding_rules))
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        f"<title>Synthetic Club - Meeting Agenda {meeting_date}</title>\n<style>\n{styles}\n</style>\n</head>\n"
+        '<body>\n<select id="GotoAgenda"><option value="1">View Another Agenda</option></select>\n'
+        '<div id="MeetingAgenda">\n<table class="agendaTable" cellspacing="0" cellpadding="4">\n'
+        "<thead><tr><th>Time</th><th>Role</th><th>Presenter</th></tr></thead>\n<tbody>\n"
+        '<tr class="agendaSection"><td colspan="3"><h3>Meeting</h3></td></tr>\n'
+        + "\n".join(rows)
+        + "\n</tbody>\n</table>\n</div>\n</body>\n</html>\n"
+    )
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.routes import router
+from app.responses import FastJSONResponse
+from app.warmup import start_warm_up
+from app.storage import close_async_store
+from app import metrics
+from app.utils.config import WARMUP_ON_STARTUP, COMPRESS_MIN_SIZE
 import os
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Allow Vercel frontend to call this API
 origins = [
@@ -19,8 +26,35 @@ app.add_middleware(
     allow_headers=["*"],  # allow all headers
 )
 
+# Uncached responses; cached ones arrive already compressed and pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE)
+
 app.include_router(router)
 
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    # Server-Timing: total time plus the number and time of storage calls for this request
+    timings = metrics.start_request()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.request_duration.observe(
+        time.perf_counter() - timings.started, method=request.method, route=path, status=response.status_code
+    )
+    metrics.storage_queries_per_request.observe(timings.queries, route=path)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return response
+
+@app.on_event("startup")
+def warm_up_heavy_modules():
+    # /health answers straight away; the scraper and numpy stack load behind it
+    if WARMUP_ON_STARTUP:
+        start_warm_up()
+
+@app.on_event("shutdown")
+async def close_storage_client():
+    await close_async_store()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
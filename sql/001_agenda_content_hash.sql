@@ -0,0 +1,4 @@
+-- Incremental agenda sync: one row per meeting date plus a content hash
+alter table agendas add column if not exists content_hash text;
+
+create unique index if not exists agendas_meeting_date_key on agendas (meeting_date);
@@ -0,0 +1,5 @@
+-- Past agenda name resolutions (lowercased alias -> member name)
+create table if not exists member_aliases (
+    alias text primary key,
+    name text not null
+);
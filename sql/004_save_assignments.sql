@@ -0,0 +1,47 @@
+-- Transactional, diff-based bulk save for POST /assignments/bulk.
+-- For every meeting date in the payload: rows whose role is missing from the payload are
+-- removed, new roles are inserted, changed assignees are updated and identical rows are
+-- left alone. Everything happens in one statement, so a failure leaves nothing half-saved.
+create unique index if not exists assignments_meeting_date_role_key
+    on assignments (meeting_date, role);
+
+create or replace function save_assignments(payload jsonb)
+returns table (meeting_date text, role text, assigned text, action text)
+language sql
+as $$
+    with incoming as (
+        -- Last entry wins if the payload repeats a (meeting_date, role)
+        select distinct on (p.meeting_date, p.role) p.meeting_date, p.role, p.assigned
+        from jsonb_populate_recordset(null::assignments, payload) with ordinality as p
+        order by p.meeting_date, p.role, p.ordinality desc
+    ),
+    existing as (
+        select a.meeting_date, a.role, a.assigned
+        from assignments a
+        join incoming i on i.meeting_date = a.meeting_date and i.role = a.role
+    ),
+    removed as (
+        delete from assignments a
+        where a.meeting_date in (select i.meeting_date from incoming i)
+          and not exists (
+              select 1 from incoming i where i.meeting_date = a.meeting_date and i.role = a.role
+          )
+        returning a.meeting_date, a.role, a.assigned
+    ),
+    written as (
+        insert into assignments (meeting_date, role, assigned)
+        select i.meeting_date, i.role, i.assigned
+        from incoming i
+        left join existing e on e.meeting_date = i.meeting_date and e.role = i.role
+        where e.role is null or e.assigned is distinct from i.assigned
+        on conflict (meeting_date, role) do update set assigned = excluded.assigned
+        returning assignments.meeting_date, assignments.role, assignments.assigned
+    )
+    select w.meeting_date::text, w.role, w.assigned,
+           case when e.role is null then 'inserted' else 'updated' end
+    from written w
+    left join existing e on e.meeting_date = w.meeting_date and e.role = w.role
+    union all
+    select r.meeting_date::text, r.role, r.assigned, 'removed'
+    from removed r;
+$$;
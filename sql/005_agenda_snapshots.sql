@@ -0,0 +1,8 @@
+-- Raw agenda HTML as fetched, gzip-compressed and base64-encoded, one row per meeting date.
+-- A row is only rewritten when html_hash (sha256 of the HTML) changes.
+create table if not exists agenda_snapshots (
+    meeting_date text primary key,
+    html_hash text not null,
+    html_gz text not null,
+    fetched_at timestamptz not null default now()
+);
@@ -0,0 +1,68 @@
+-- Multi-club storage: every table gets a club_id. Existing rows belong to 'default',
+-- which is DEFAULT_CLUB_ID unless configured otherwise.
+alter table agendas add column if not exists club_id text not null default 'default';
+alter table assignments add column if not exists club_id text not null default 'default';
+alter table members add column if not exists club_id text not null default 'default';
+alter table member_aliases add column if not exists club_id text not null default 'default';
+alter table agenda_snapshots add column if not exists club_id text not null default 'default';
+
+drop index if exists agendas_meeting_date_key;
+create unique index if not exists agendas_club_meeting_date_key on agendas (club_id, meeting_date);
+
+drop index if exists assignments_meeting_date_role_key;
+create unique index if not exists assignments_club_meeting_date_role_key
+    on assignments (club_id, meeting_date, role);
+
+create index if not exists members_club_name on members (club_id, name);
+
+alter table member_aliases drop constraint if exists member_aliases_pkey;
+alter table member_aliases add primary key (club_id, alias);
+
+alter table agenda_snapshots drop constraint if exists agenda_snapshots_pkey;
+alter table agenda_snapshots add primary key (club_id, meeting_date);
+
+-- sql/004 with a club argument
+drop function if exists save_assignments(jsonb);
+
+create or replace function save_assignments(payload jsonb, club text default 'default')
+returns table (meeting_date text, role text, assigned text, action text)
+language sql
+as $$
+    with incoming as (
+        -- Last entry wins if the payload repeats a (meeting_date, role)
+        select distinct on (p.meeting_date, p.role) p.meeting_date, p.role, p.assigned
+        from jsonb_populate_recordset(null::assignments, payload) with ordinality as p
+        order by p.meeting_date, p.role, p.ordinality desc
+    ),
+    existing as (
+        select a.meeting_date, a.role, a.assigned
+        from assignments a
+        join incoming i on i.meeting_date = a.meeting_date and i.role = a.role
+        where a.club_id = club
+    ),
+    removed as (
+        delete from assignments a
+        where a.club_id = club
+          and a.meeting_date in (select i.meeting_date from incoming i)
+          and not exists (
+              select 1 from incoming i where i.meeting_date = a.meeting_date and i.role = a.role
+          )
+        returning a.meeting_date, a.role, a.assigned
+    ),
+    written as (
+        insert into assignments (club_id, meeting_date, role, assigned)
+        select club, i.meeting_date, i.role, i.assigned
+        from incoming i
+        left join existing e on e.meeting_date = i.meeting_date and e.role = i.role
+        where e.role is null or e.assigned is distinct from i.assigned
+        on conflict (club_id, meeting_date, role) do update set assigned = excluded.assigned
+        returning assignments.meeting_date, assignments.role, assignments.assigned
+    )
+    select w.meeting_date::text, w.role, w.assigned,
+           case when e.role is null then 'inserted' else 'updated' end
+    from written w
+    left join existing e on e.meeting_date = w.meeting_date and e.role = w.role
+    union all
+    select r.meeting_date::text, r.role, r.assigned, 'removed'
+    from removed r;
+$$;
@@ -0,0 +1,8 @@
+-- Progress of a club's unfinished sync: agendas up to last_date are written, so the next
+-- sync with the same full/incremental mode resumes after it. Cleared when a sync completes.
+create table if not exists sync_checkpoints (
+    club_id text primary key,
+    full_sync boolean not null,
+    last_date text not null,
+    updated_at timestamptz not null default now()
+);
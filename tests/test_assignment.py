@@ -0,0 +1,57 @@
+import datetime
+import itertools
+import numpy as np
+import pytest
+from app.assignment import build_role_history, get_suggested_assignments, linear_sum_assignment, solve_cost
+
+
+def brute_force_cost(cost):
+    # Cheapest assignment of every row (or every column, if fewer) by trying all of them
+    rows, cols = cost.shape
+    if rows <= cols:
+        return min(sum(cost[r, c] for r, c in enumerate(perm)) for perm in itertools.permutations(range(cols), rows))
+    return min(sum(cost[r, c] for c, r in enumerate(perm)) for perm in itertools.permutations(range(rows), cols))
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (2, 5), (3, 6), (5, 2), (6, 3)])
+def test_linear_sum_assignment_matches_brute_force(shape):
+    rng = np.random.default_rng(sum(shape))
+    for _ in range(25):
+        cost = rng.integers(0, 20, size=shape).astype(float)
+        rows, cols = linear_sum_assignment(cost)
+        assert len(rows) == min(shape)
+        assert len(set(rows.tolist())) == len(rows) and len(set(cols.tolist())) == len(cols)
+        assert list(rows) == sorted(rows)
+        assert cost[rows, cols].sum() == pytest.approx(brute_force_cost(cost))
+
+
+def test_linear_sum_assignment_empty():
+    rows, cols = linear_sum_assignment(np.zeros((0, 3)))
+    assert len(rows) == 0 and len(cols) == 0
+
+
+def test_solve_cost_leaves_later_slots_empty_when_members_run_out():
+    cost = np.zeros((3, 1))
+    assert solve_cost(cost, ["Ann Lee"]) == ["Ann Lee", "", ""]
+    assert solve_cost(np.zeros((2, 0)), []) == ["", ""]
+
+
+def test_suggestions_avoid_recent_repeats_and_duplicates():
+    agenda = [
+        {"Role": "Timer", "Name": ""},
+        {"Role": "Speaker 1", "Name": ""},
+        {"Role": "Ah Counter", "Name": "Cara Diaz"},
+    ]
+    members = ["Ann Lee", "Bob Ray", "Cara Diaz", "Dan Wu", "Eve Kim"]
+    history = build_role_history([
+        {"Name": "Ann Lee", "Role": "Timer", "MeetingDate": "2025-01-01"},
+        {"Name": "Bob Ray", "Role": "Speaker 2", "MeetingDate": "2025-01-01"},
+    ])
+    roster = get_suggested_assignments(agenda, history, members, seed=3, meeting_date=datetime.date(2025, 1, 8))
+
+    primaries = [slot["Primary"] for slot in roster]
+    assert primaries[2] == "Cara Diaz"  # names already on the agenda stay
+    assert primaries[0] != "Ann Lee" and primaries[1] != "Bob Ray"
+    assert len(set(primaries)) == len(primaries)
+    assert not {slot["Backup"] for slot in roster} & set(primaries)
+    assert roster == get_suggested_assignments(agenda, history, members, seed=3, meeting_date=datetime.date(2025, 1, 8))
@@ -0,0 +1,102 @@
+import random
+from datetime import date
+from app.assignment import build_role_history, canonicalize_role
+from app.history import RoleHistory, is_counted
+
+ROLES = ["Toastmaster", "Timer", "Ah Counter", "Speaker 1", "Speaker 2", "Evaluator 1", "Call to order"]
+NAMES = ["Ann Lee", "Bob Ray", "Cara Diaz", "Dan Wu", "Eve Kim"]
+
+
+def make_agendas(seed=1, meetings=30):
+    # Weekly agendas from late 2024 into 2025, in shuffled storage order
+    rng = random.Random(seed)
+    records = []
+    for week in range(meetings):
+        meeting_date = date.fromordinal(date(2024, 11, 6).toordinal() + 7 * week).isoformat()
+        items = [
+            {"Role": role, "Name": rng.choice(NAMES + [""]), "SortOrder": position}
+            for position, role in enumerate(ROLES, 1)
+        ]
+        rng.shuffle(items)
+        records.append({"meeting_date": meeting_date, "agenda_json": items})
+    rng.shuffle(records)
+    return records
+
+
+def flatten(records):
+    # Named roles in agenda order, the input build_role_history expects
+    rows = []
+    for record in records:
+        for item in sorted(record["agenda_json"], key=lambda item: item["SortOrder"]):
+            if item["Name"]:
+                rows.append({"Name": item["Name"], "Role": item["Role"], "MeetingDate": record["meeting_date"]})
+    return rows
+
+
+def test_role_history_matches_build_role_history():
+    records = make_agendas()
+    history = RoleHistory.from_agendas(records)
+    for before in [None, "2025-01-01", "2025-01-08", "2025-03-04", "2024-11-06"]:
+        past = [row for row in flatten(records) if before is None or row["MeetingDate"] < before]
+        for depth in (1, 3, 10):
+            assert history.role_history(before, depth) == build_role_history(past, depth)
+
+
+def test_summary_matches_naive_counts():
+    records = make_agendas(seed=2)
+    history = RoleHistory.from_agendas(records)
+    rows = sorted(
+        (row for row in flatten(records) if is_counted(row["Role"])),
+        key=lambda row: row["MeetingDate"], reverse=True,
+    )
+
+    expected = {}
+    for row in rows:
+        total, last, recent = expected.get(row["Name"], (0, None, []))
+        expected[row["Name"]] = (total + 1, last or date.fromisoformat(row["MeetingDate"]), recent + [row["Role"]])
+    expected = {name: (total, last, recent[:3]) for name, (total, last, recent) in expected.items()}
+    assert history.summary(depth=3) == expected
+
+
+def test_role_frequencies_labels_and_counts():
+    records = [
+        {"meeting_date": "2024-12-18", "agenda_json": [{"Role": "Timer", "Name": "Ann Lee"}]},
+        {"meeting_date": "2025-01-08", "agenda_json": [
+            {"Role": "Speaker 1", "Name": "Ann Lee"}, {"Role": "Speaker 2", "Name": "Ann Lee"},
+            {"Role": "Call to order", "Name": "Bob Ray"},
+        ]},
+        {"meeting_date": "2025-03-26", "agenda_json": [{"Role": "Timer", "Name": "Bob Ray"}]},
+        {"meeting_date": "2025-04-02", "agenda_json": [{"Role": "Timer", "Name": "Ann Lee"}]},
+    ]
+    history = RoleHistory.from_agendas(records)
+
+    labels, counts = history.role_frequencies("month")
+    assert labels == ["2024-12", "2025-01", "2025-02", "2025-03", "2025-04"]
+    assert counts == {
+        "Ann Lee": {"Timer": [1, 0, 0, 0, 1], "Speaker": [0, 2, 0, 0, 0]},
+        "Bob Ray": {"Timer": [0, 0, 0, 1, 0]},
+    }
+
+    labels, counts = history.role_frequencies("quarter")
+    assert labels == ["2024-Q4", "2025-Q1", "2025-Q2"]
+    assert counts["Ann Lee"] == {"Timer": [1, 0, 1], "Speaker": [0, 2, 0]}
+    assert counts["Bob Ray"] == {"Timer": [0, 1, 0]}
+
+    labels, counts = history.role_frequencies("year")
+    assert labels == ["2024", "2025"]
+    assert counts["Ann Lee"] == {"Timer": [1, 1], "Speaker": [0, 2]}
+
+
+def test_role_frequencies_start_and_end_are_inclusive():
+    records = make_agendas(seed=3)
+    history = RoleHistory.from_agendas(records)
+    labels, counts = history.role_frequencies("quarter", start="2025-01-01", end="2025-03-26")
+    assert labels == ["2025-Q1"]
+
+    expected = {}
+    for row in flatten(records):
+        if "2025-01-01" <= row["MeetingDate"] <= "2025-03-26" and is_counted(row["Role"]):
+            expected.setdefault(row["Name"], {}).setdefault(canonicalize_role(row["Role"]), [0])[0] += 1
+    assert counts == expected
+
+    assert history.role_frequencies("month", start="2030-01-01") == ([], {})
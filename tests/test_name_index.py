@@ -0,0 +1,66 @@
+from app.name_index import NameIndex, edit_distance
+
+MEMBERS = ["John Smith", "Johnny Bravo", "Jo Park", "Maria Gonzalez", "Alexander Hamilton", "Ann Lee"]
+
+
+def test_exact_match_ignores_case_and_spacing():
+    index = NameIndex(MEMBERS)
+    assert index.resolve("  john   SMITH ") == "John Smith"
+    assert index.learned == {}  # exact matches are not remembered as aliases
+
+
+def test_prefix_prefers_whole_word_completion():
+    index = NameIndex(MEMBERS)
+    assert index.resolve("John") == "John Smith"
+    assert index.resolve("Johnn") == "Johnny Bravo"
+    assert index.resolve("Mar") == "Maria Gonzalez"
+
+
+def test_longer_name_resolves_to_member_it_starts_with():
+    index = NameIndex(MEMBERS)
+    assert index.resolve("John Smith (Guest)") == "John Smith"
+
+
+def test_fuzzy_match_within_distance():
+    index = NameIndex(MEMBERS, max_distance=2)
+    assert index.resolve("Maria Gonzales") == "Maria Gonzalez"
+    assert index.resolve("Alexandr Hamiltn") == "Alexander Hamilton"
+    # Full names of up to 7 characters allow one edit, and the first letter must match
+    assert index.resolve("Ann Lea") == "Ann Lee"
+    assert index.resolve("Ann Lxx") is None
+    assert index.resolve("Bnn Lee") is None
+
+
+def test_short_names_and_first_names_are_not_guessed():
+    index = NameIndex(["Tim Baker", "Ann Lee", "Maria Gonzalez"])
+    assert index.resolve("Tom") is None
+    assert index.resolve("Axn") is None
+    assert index.resolve("Mariah") is None
+    assert index.resolve("A Lee") is None
+
+
+def test_unknown_and_empty_names():
+    index = NameIndex(MEMBERS)
+    assert index.resolve("Zoe Quinn") is None
+    assert index.resolve("   ") is None
+
+
+def test_aliases_only_for_existing_members():
+    index = NameIndex(MEMBERS, aliases={"Jonno": "John Smith", "Old Friend": "Left Club"})
+    assert index.resolve("jonno") == "John Smith"
+    assert index.resolve("Old Friend") is None
+
+
+def test_prefix_resolutions_are_learned_but_fuzzy_ones_are_not():
+    index = NameIndex(MEMBERS)
+    assert index.resolve("Maria Gonzales") == "Maria Gonzalez"
+    assert index.resolve("Ann") == "Ann Lee"
+    assert index.learned == {"ann": "Ann Lee"}
+    assert index.aliases["ann"] == "Ann Lee"
+    assert "maria gonzales" not in index.aliases
+
+
+def test_edit_distance_is_bounded():
+    assert edit_distance("kitten", "sitting", 5) == 3
+    assert edit_distance("kitten", "sitting", 2) == 3  # max_distance + 1 once over the bound
+    assert edit_distance("a", "abcdef", 2) == 3
@@ -0,0 +1,85 @@
+import pytest
+from app.assignment import MeetingState, build_role_history, resuggest_roles
+
+AGENDA = [
+    {"Role": "Toastmaster", "Name": ""},
+    {"Role": "Timer", "Name": ""},
+    {"Role": "Ah Counter", "Name": ""},
+    {"Role": "Speaker 1", "Name": ""},
+]
+MEMBERS = ["Ann Lee", "Bob Ray", "Cara Diaz", "Dan Wu", "Eve Kim", "Fay Ho", "Gus Orr", "Hal Poe", "Ivy Tan"]
+HISTORY = build_role_history([
+    {"Name": "Ann Lee", "Role": "Timer", "MeetingDate": "2025-01-01"},
+    {"Name": "Dan Wu", "Role": "Speaker 1", "MeetingDate": "2024-12-25"},
+])
+
+
+@pytest.fixture
+def state():
+    return MeetingState(AGENDA, HISTORY, MEMBERS, meeting_date="2025-01-08", seed=7)
+
+
+def check_roster(roster):
+    primaries = [slot["Primary"] for slot in roster if slot["Primary"]]
+    assert len(set(primaries)) == len(primaries)
+    assert not {slot["Backup"] for slot in roster} & set(primaries)
+
+
+def test_pinning_an_unused_member_changes_only_that_slot(state):
+    roster = state.suggest()
+    pinned = next(m for m in MEMBERS if m not in {s["Primary"] for s in roster} | {s["Backup"] for s in roster})
+
+    updated = resuggest_roles(state, roster, "Timer", pinned)
+    assert updated[1]["Primary"] == pinned
+    assert [slot for i, slot in enumerate(updated) if i != 1] == [slot for i, slot in enumerate(roster) if i != 1]
+    check_roster(updated)
+
+
+def test_pinning_another_slots_primary_refills_that_slot(state):
+    roster = state.suggest()
+    moved = roster[3]["Primary"]
+
+    updated = resuggest_roles(state, roster, "Toastmaster", moved)
+    assert updated[0]["Primary"] == moved
+    assert updated[3]["Primary"] not in ("", moved)
+    assert updated[1]["Primary"] == roster[1]["Primary"] and updated[2]["Primary"] == roster[2]["Primary"]
+    check_roster(updated)
+
+
+def test_pinning_a_backup_replaces_that_backup(state):
+    roster = state.suggest()
+    backup = roster[2]["Backup"]
+
+    updated = resuggest_roles(state, roster, "Timer", backup)
+    assert updated[1]["Primary"] == backup
+    assert updated[2]["Backup"] not in ("", backup)
+    check_roster(updated)
+
+
+def test_clearing_a_primary_suggests_someone_else(state):
+    roster = state.suggest()
+    updated = resuggest_roles(state, roster, "Ah Counter", "")
+    assert updated[2]["Primary"]
+    check_roster(updated)
+
+
+def test_input_roster_is_not_modified(state):
+    roster = state.suggest()
+    before = [dict(slot) for slot in roster]
+    resuggest_roles(state, roster, "Timer", roster[0]["Primary"])
+    assert roster == before
+
+
+def test_unknown_roles_are_rejected(state):
+    roster = state.suggest()
+    with pytest.raises(ValueError, match="Role not in roster"):
+        resuggest_roles(state, roster, "Grammarian", "Ann Lee")
+    with pytest.raises(ValueError, match="not on the stored agenda"):
+        resuggest_roles(state, roster + [{"Role": "Grammarian", "Original": "", "Primary": "", "Backup": ""}], "Timer")
+
+
+def test_suggest_matches_the_state_costs(state):
+    # The served roster is the one later edits start from: a no-op edit changes nothing
+    roster = state.suggest()
+    for slot in roster:
+        assert resuggest_roles(state, roster, slot["Role"], slot["Primary"]) == roster
@@ -0,0 +1,54 @@
+from app.storage.sqlite_store import SQLiteStore
+
+
+def rows(store, meeting_date):
+    return {row['role']: row['assigned'] for row in store.assignments.for_date(meeting_date)}
+
+
+def actions(changes):
+    return sorted((change['meeting_date'], change['role'], change['assigned'], change['action']) for change in changes)
+
+
+def test_save_bulk_round_trip():
+    store = SQLiteStore()
+    first = [
+        {'meeting_date': '2025-01-08', 'role': 'Timer', 'assigned': 'Ann Lee'},
+        {'meeting_date': '2025-01-08', 'role': 'Toastmaster', 'assigned': 'Bob Ray'},
+        {'meeting_date': '2025-01-08', 'role': 'Ah Counter', 'assigned': 'Cara Diaz'},
+        {'meeting_date': '2025-01-15', 'role': 'Timer', 'assigned': 'Dan Wu'},
+    ]
+    assert actions(store.assignments.save_bulk(first)) == actions([dict(record, action='inserted') for record in first])
+
+    # Update one, keep one, drop one and add one on the first date; the second date is not in the payload
+    changes = store.assignments.save_bulk([
+        {'meeting_date': '2025-01-08', 'role': 'Timer', 'assigned': 'Eve Kim'},
+        {'meeting_date': '2025-01-08', 'role': 'Toastmaster', 'assigned': 'Bob Ray'},
+        {'meeting_date': '2025-01-08', 'role': 'Speaker 1', 'assigned': 'Fay Ho'},
+    ])
+    assert actions(changes) == [
+        ('2025-01-08', 'Ah Counter', 'Cara Diaz', 'removed'),
+        ('2025-01-08', 'Speaker 1', 'Fay Ho', 'inserted'),
+        ('2025-01-08', 'Timer', 'Eve Kim', 'updated'),
+    ]
+    assert rows(store, '2025-01-08') == {'Timer': 'Eve Kim', 'Toastmaster': 'Bob Ray', 'Speaker 1': 'Fay Ho'}
+    assert rows(store, '2025-01-15') == {'Timer': 'Dan Wu'}
+    assert store.assignments.dates() == ['2025-01-15', '2025-01-08']
+
+
+def test_save_bulk_unchanged_payload_is_a_no_op():
+    store = SQLiteStore()
+    records = [{'meeting_date': '2025-01-08', 'role': 'Timer', 'assigned': 'Ann Lee'}]
+    store.assignments.save_bulk(records)
+    assert store.assignments.save_bulk(records) == []
+    assert rows(store, '2025-01-08') == {'Timer': 'Ann Lee'}
+
+
+def test_save_bulk_is_scoped_to_the_club():
+    store = SQLiteStore()
+    other = store.for_club('other')
+    store.assignments.save_bulk([{'meeting_date': '2025-01-08', 'role': 'Timer', 'assigned': 'Ann Lee'}])
+    changes = other.assignments.save_bulk([{'meeting_date': '2025-01-08', 'role': 'Toastmaster', 'assigned': 'Bob Ray'}])
+
+    assert actions(changes) == [('2025-01-08', 'Toastmaster', 'Bob Ray', 'inserted')]
+    assert rows(store, '2025-01-08') == {'Timer': 'Ann Lee'}
+    assert rows(other, '2025-01-08') == {'Toastmaster': 'Bob Ray'}